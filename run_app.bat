@@ -12,10 +12,10 @@ call venv\Scripts\activate.bat
 REM Navigate to backend directory
 cd thread-2-tok\backend
 
-REM Run the app
+REM Run the launcher (uses the generator daemon when it is running)
 echo Starting the app...
 echo.
-py app.py
+py launcher.py --no-pause
 
 REM Keep window open if there's an error
 if errorlevel 1 (
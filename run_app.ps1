@@ -13,10 +13,10 @@ Write-Host "Activating virtual environment..." -ForegroundColor Yellow
 # Navigate to backend directory
 Set-Location "thread-2-tok\backend"
 
-# Run the app
+# Run the launcher (uses the generator daemon when it is running)
 Write-Host "Starting the app..." -ForegroundColor Green
 Write-Host ""
-py app.py
+py launcher.py --no-pause
 
 # Keep window open if there's an error
 if ($LASTEXITCODE -ne 0) {
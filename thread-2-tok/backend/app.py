@@ -1,85 +1,155 @@
 from flask import Flask, request, jsonify, send_file, Response
 from flask_cors import CORS
-import praw  # Python Reddit Wrapper
-import edge_tts
 import asyncio
-from tiktok_voice_api import TikTokTTS
-import requests
-from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip, TextClip, CompositeAudioClip, ImageClip
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
 import textwrap
 from dotenv import load_dotenv
 import os
 import random
 import json
 import time
+import threading
+import functools
+import shutil
+import tempfile
+import subprocess
+import re
+import logging
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from candidate_pool import CandidatePool
+from candidate_index import (
+    is_listing_fresh, record_listing, query_candidates, set_candidate_status,
+    reset_used_candidates, STATUS_USED, STATUS_BLACKLISTED
+)
+from story_state import StoryStateStore
+from caption_track import CaptionCue, CaptionTrack
+from ffmpeg_render import compute_vertical_crop, probe_duration, probe_media, render_with_ffmpeg
+from background_prep import find_mezzanine, pick_segment_start
+from tts_cache import TTSCache, tts_cache_key
+from render_profiler import FRAME_PROFILE_DIR, FrameProfiler
+from render_profiles import RENDER_PROFILES, get_render_profile, x264_args
+import metrics
+from jobs import JobManager, JobQueueFull, JobCancelled, FINISHED_STATUSES, STATUS_DONE
+
+# Heavy dependencies (praw, edge_tts, tiktok_voice_api, moviepy, PIL, numpy) are imported
+# inside the functions that need them, so importing app.py stays fast (see benchmarks/import_budget.py)
 
 # Load environment variables
 load_dotenv()
 
+# Per-item progress (each listing, each caption) is only shown with LOG_LEVEL=DEBUG
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+logger = logging.getLogger("thread2tok")
+
 # Files to track used content to avoid repeats
-USED_STORIES_FILE = "used_stories.json"
+USED_STORIES_FILE = "used_stories.jsonl"
 LAST_VOICE_FILE = "last_voice.json"
-BLACKLISTED_STORIES_FILE = "blacklisted_stories.json"
+BLACKLISTED_STORIES_FILE = "blacklisted_stories.jsonl"
+
+# Append-only logs (the old whole-file JSON versions are migrated on first use)
+used_stories_store = StoryStateStore(
+    USED_STORIES_FILE, ttl=7 * 24 * 3600,
+    legacy_file="used_stories.json", legacy_key="used_ids"
+)
+blacklisted_stories_store = StoryStateStore(
+    BLACKLISTED_STORIES_FILE,
+    legacy_file="blacklisted_stories.json", legacy_key="blacklisted_ids"
+)
 
 app = Flask(__name__)
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Disable caching
 CORS(app)  # Enable Cross-Origin Resource Sharing for React
 
 # Reddit API setup
-reddit = praw.Reddit(
-    client_id=os.getenv("CLIENT_ID"),
-    client_secret=os.getenv("CLIENT_SECRET"),
-    user_agent="thread-2-tok/0.1 by u/Complex_Balance4016"
-)
+# Listings are fetched concurrently; every request still goes through one shared rate limiter
+MAX_LISTING_WORKERS = 6
+# A refresh stops pulling listing pages once this many new fresh candidates are collected
+CANDIDATE_TARGET = int(os.getenv("CANDIDATE_TARGET", "50"))
+_listing_pool = None
+_listing_pool_lock = threading.Lock()
+# Reddit allows 100 QPM per OAuth client, averaged over a 10 minute window: a burst of 50 on top
+# of 95 QPM stays within any window's 1000 requests. prawcore still backs off on X-Ratelimit headers.
+REDDIT_REQUESTS_PER_MINUTE = 95
+REDDIT_REQUEST_BURST = 50
 
-def select_quality_weighted_story(posts):
-    """Select a story using quality-weighted random selection."""
-    if not posts:
-        return None
-    
-    # Sort posts by score for analysis
-    sorted_posts = sorted(posts, key=lambda p: p.score, reverse=True)
+class RedditRateLimiter:
+    """Token bucket shared by all fetch threads so concurrency never exceeds Reddit's rate limit."""
     
-    # Show score distribution
-    scores = [p.score for p in sorted_posts]
-    if scores:
-        print(f"  📊 Score range: {min(scores)} - {max(scores)} (avg: {sum(scores)//len(scores)})")
-        
-        # Show top scores for reference
-        top_5_scores = scores[:5] if len(scores) >= 5 else scores
-        print(f"  🏆 Top scores available: {top_5_scores}")
+    def __init__(self, requests_per_minute=REDDIT_REQUESTS_PER_MINUTE, burst=REDDIT_REQUEST_BURST):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
     
-    # Create weighted selection based on score
-    # Higher scores get exponentially higher weights
-    weights = []
-    for post in posts:
-        score = post.score
-        
-        # Weight calculation: heavily favor high scores
-        if score >= 100:
-            weight = score * 3  # 3x weight for 100+ scores
-        elif score >= 50:
-            weight = score * 2  # 2x weight for 50+ scores
-        elif score >= 20:
-            weight = score * 1.5  # 1.5x weight for 20+ scores
-        else:
-            weight = score  # Normal weight for lower scores
-        
-        weights.append(weight)
-    
-    # Weighted random selection
-    selected_post = random.choices(posts, weights=weights)[0]
+    def acquire(self):
+        """Block until a request token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+reddit_rate_limiter = RedditRateLimiter()
+
+def create_rate_limited_session():
+    """HTTP session for praw that waits on the shared rate limiter before every request."""
+    import requests
     
-    # Show selection info
-    total_weight = sum(weights)
-    selected_weight = weights[posts.index(selected_post)]
-    selection_probability = (selected_weight / total_weight) * 100
+    session = requests.Session()
+    send_request = session.request
     
-    print(f"  🎯 Selected post with score {selected_post.score} ({selection_probability:.1f}% selection probability)")
+    def request(*args, **kwargs):
+        reddit_rate_limiter.acquire()
+        return send_request(*args, **kwargs)
     
-    return selected_post
+    session.request = request
+    return session
+
+_reddit_local = threading.local()
+_reddit_authorizer = None
+_reddit_authorizer_lock = threading.Lock()
+
+def get_reddit():
+    """
+    Return this thread's Reddit client (praw clients are not thread-safe).
+    All clients share the first one's read-only authorizer, so the OAuth token is fetched once.
+    """
+    global _reddit_authorizer
+    client = getattr(_reddit_local, "client", None)
+    if client is None:
+        import praw  # Python Reddit Wrapper
+        import prawcore
+        
+        client = praw.Reddit(
+            client_id=os.getenv("CLIENT_ID"),
+            client_secret=os.getenv("CLIENT_SECRET"),
+            user_agent="thread-2-tok/0.1 by u/Complex_Balance4016",
+            requestor_kwargs={"session": create_rate_limited_session()}
+        )
+        with _reddit_authorizer_lock:
+            if _reddit_authorizer is None:
+                authorizer = client._read_only_core._authorizer
+                authorizer.refresh()  # The one token request, made before other threads can share it
+                _reddit_authorizer = authorizer
+            else:
+                # Own prawcore session (and header-based rate limiter) per thread, shared token
+                client._core = client._read_only_core = prawcore.Session(_reddit_authorizer)
+        _reddit_local.client = client
+    return client
+
+# Content paths: key -> (subreddits, display name)
+SUBREDDIT_PATHS = {
+    "personal": (["TrueOffMyChest", "Confessions"], "Personal Stories"),
+    "aita": (["AmItheAsshole", "AITA"], "AITA Stories"),
+    "spooky": (["nosleep", "scarystories"], "Spooky Stories"),
+}
 
 # Helper function to fetch a Reddit story from multiple subreddits
 def get_subreddit_selection():
@@ -112,13 +182,13 @@ def get_subreddit_selection():
             
             if choice == "1":
                 print("✅ Selected: PERSONAL STORIES PATH (TrueOffMyChest + Confessions)")
-                return ["TrueOffMyChest", "Confessions"], "Personal Stories"
+                return SUBREDDIT_PATHS["personal"]
             elif choice == "2":
                 print("✅ Selected: AITA PATH (AmItheAsshole + AITA)")
-                return ["AmItheAsshole", "AITA"], "AITA Stories"
+                return SUBREDDIT_PATHS["aita"]
             elif choice == "3":
                 print("✅ Selected: SPOOKY PATH (NoSleep + ScaryStories)")
-                return ["nosleep", "scarystories"], "Spooky Stories"
+                return SUBREDDIT_PATHS["spooky"]
             else:
                 print("❌ Please enter 1, 2, or 3")
                 
@@ -126,95 +196,205 @@ def get_subreddit_selection():
             print("\n👋 Exiting...")
             exit(0)
 
-def fetch_story_from_multiple_subreddits(subreddits):
-    """Fetch stories from selected subreddits."""
+# Quality-focused search strategy: prioritize top posts across all time periods
+SEARCH_STRATEGIES = [
+    ("top", "all", 500, "🏆 All-time top posts"),
+    ("top", "year", 400, "📅 This year's top posts"),
+    ("top", "month", 300, "📅 This month's top posts"),
+    ("hot", None, 200, "🔥 Currently hot posts"),
+    ("top", "week", 200, "📅 This week's top posts"),
+    ("new", None, 100, "🆕 Recent posts (for variety)"),
+]
+
+def iter_text_posts(posts):
+    """Posts with text content."""
+    return (post for post in posts if post.selftext)
+
+def iter_sized_posts(posts):
+    """Posts within the length limits for 2:50, not stickied and with the minimum score."""
+    for post in posts:
+        # Enhanced criteria with minimum score threshold
+        if (len(post.selftext) > 100   # Minimum for good stories
+            and len(post.selftext) < 3000  # Conservative max for 2:50
+            and not post.stickied 
+            and post.score >= 10  # Higher minimum score for quality
+            and len(post.title + post.selftext) < 3200):  # Conservative total
+            yield post
+
+def iter_non_update_posts(posts):
+    """Posts that are not updates or later parts of another story."""
+    update_posts_filtered = 0
+    for post in posts:
+        if post.title.upper().startswith(('UPDATE:', 'EDIT:', 'FINAL UPDATE', 'PART 2', 'PART 3')):
+            update_posts_filtered += 1
+        else:
+            yield post
     
-    for subreddit_name in subreddits:
-        print(f"🔍 Searching r/{subreddit_name}...")
-        story = fetch_story_from_subreddit(subreddit_name)
-        if story:
-            return story
+    if update_posts_filtered > 0:
+        logger.debug("      Filtered out %d update posts", update_posts_filtered)
+
+def iter_valid_length_posts(posts):
+    """Posts whose narration passes the HARD 2:50 validation."""
+    for post in posts:
+        is_valid, duration = validate_story_length({"title": post.title, "body": post.selftext})
+        if is_valid:
+            yield post
+
+def iter_qualified_posts(posts):
+    """The story quality filters as a lazy chain: each post is pulled from `posts` only when needed."""
+    return iter_valid_length_posts(iter_non_update_posts(iter_sized_posts(iter_text_posts(posts))))
+
+def filter_listing_posts(posts):
+    """Apply the story quality filters to a raw listing and return the posts that pass."""
+    return list(iter_qualified_posts(posts))
+
+class CandidateCollector:
+    """
+    Shared by the listing fetches of one refresh: counts new fresh candidates across threads,
+    sets `stop` once `target` of them are collected (listings then stop pulling pages) and
+    keeps the score spread of what was collected.
+    """
     
-    print("❌ No suitable stories found in any subreddit")
-    return None
+    def __init__(self, target, known_ids=()):
+        self.target = target
+        self.known_ids = known_ids  # Used, blacklisted or already indexed: not new candidates
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.new_ids = set()
+        self.scores = []
+        self.pulled = 0
+        self.qualified = 0
+    
+    def pull(self, posts, counts):
+        """Yield raw listing posts until the listing ends or the target is reached. counts["complete"] tells which."""
+        iterator = iter(posts)
+        counts["complete"] = False
+        while not self.stop.is_set():
+            try:
+                post = next(iterator)  # May fetch the next listing page
+            except StopIteration:
+                counts["complete"] = True
+                return
+            counts["posts"] = counts.get("posts", 0) + 1
+            with self.lock:
+                self.pulled += 1
+            yield post
+    
+    def add(self, post):
+        """Record a qualified post. Returns True if it is a new fresh candidate."""
+        with self.lock:
+            self.qualified += 1
+            if post.id in self.known_ids or post.id in self.new_ids:
+                return False
+            self.new_ids.add(post.id)
+            self.scores.append(post.score)
+            if len(self.new_ids) >= self.target:
+                self.stop.set()
+            return True
+    
+    def spread(self):
+        """(min, median, max) score of the new candidates, or None if there are none."""
+        with self.lock:
+            scores = sorted(self.scores)
+        if not scores:
+            return None
+        return scores[0], scores[len(scores) // 2], scores[-1]
 
-def fetch_story_from_subreddit(subreddit_name):
-    """Fetch a story from a specific subreddit with quality-focused selection."""
+def fetch_listing(subreddit_name, sort_method, time_filter, limit, description, collector=None):
+    """
+    Stream one listing through the filters into the candidate index. With a collector the
+    listing stops pulling pages once the collector has enough candidates; a listing cut
+    short is not marked as fetched, so a later refresh reads it again.
+    """
+    collector = collector or CandidateCollector(float("inf"))
+    if collector.stop.is_set():
+        return 0
     try:
-        subreddit_obj = reddit.subreddit(subreddit_name)
-        
-        print(f"  🎯 Quality-focused search - prioritizing high-scoring posts...")
-        
-        # Quality-focused search strategy: prioritize top posts across all time periods
-        search_strategies = [
-            ("top", "all", 500, "🏆 All-time top posts"),
-            ("top", "year", 400, "📅 This year's top posts"),
-            ("top", "month", 300, "📅 This month's top posts"),
-            ("hot", None, 200, "🔥 Currently hot posts"),
-            ("top", "week", 200, "📅 This week's top posts"),
-            ("new", None, 100, "🆕 Recent posts (for variety)"),
-        ]
-        
-        all_posts = []
-        
-        for sort_method, time_filter, limit, description in search_strategies:
-            try:
-                print(f"    {description}...")
-                
-                if sort_method == "top" and time_filter:
-                    posts = subreddit_obj.top(time_filter=time_filter, limit=limit)
-                elif sort_method == "hot":
-                    posts = subreddit_obj.hot(limit=limit)
-                elif sort_method == "new":
-                    posts = subreddit_obj.new(limit=limit)
-                else:
-                    continue
-                
-                # Filter for posts with text content
-                posts_with_text = [post for post in posts if post.selftext]
-                update_posts_filtered = 0
-                
-                valid_posts = []
-                for post in posts_with_text:
-                    # Enhanced criteria with minimum score threshold
-                    if (len(post.selftext) > 100   # Minimum for good stories
-                        and len(post.selftext) < 3000  # Conservative max for 2:50
-                        and not post.stickied 
-                        and post.score >= 10  # Higher minimum score for quality
-                        and len(post.title + post.selftext) < 3200):  # Conservative total
-                        
-                        # Check if it's an update post (skip update posts)
-                        if post.title.upper().startswith(('UPDATE:', 'EDIT:', 'FINAL UPDATE', 'PART 2', 'PART 3')):
-                            update_posts_filtered += 1
-                        else:
-                            valid_posts.append(post)
-                
-                if update_posts_filtered > 0:
-                    print(f"      Filtered out {update_posts_filtered} update posts")
-                
-                # Apply HARD 2:50 validation to each post
-                validated_posts = []
-                for post in valid_posts:
-                    test_story = {
-                        "title": post.title,
-                        "body": post.selftext
-                    }
-                    is_valid, duration = validate_story_length(test_story)
-                    if is_valid:
-                        validated_posts.append(post)
-                
-                print(f"      Found {len(validated_posts)} quality posts (score ≥10, ≤2:50)")
-                all_posts.extend(validated_posts)
-                
-                # Continue collecting from all sources for better selection
-                
-            except Exception as e:
-                print(f"      Error fetching {description}: {e}")
-                continue
+        subreddit_obj = get_reddit().subreddit(subreddit_name)
+        
+        # Network time and filtering are interleaved, both land in this span
+        with metrics.span("listing_fetch", subreddit=subreddit_name.lower(), sort=sort_method) as attrs:
+            if sort_method == "top" and time_filter:
+                posts = subreddit_obj.top(time_filter=time_filter, limit=limit)
+            elif sort_method == "hot":
+                posts = subreddit_obj.hot(limit=limit)
+            elif sort_method == "new":
+                posts = subreddit_obj.new(limit=limit)
+            else:
+                return 0
+            validated_posts = []
+            fresh = 0
+            for post in iter_qualified_posts(collector.pull(posts, attrs)):
+                validated_posts.append(post)
+                fresh += collector.add(post)
+            attrs["passed"] = len(validated_posts)
+            attrs["fresh"] = fresh
+        logger.debug("    r/%s %s: %d quality posts (score ≥10, ≤2:50), %d new%s", subreddit_name, description,
+                     len(validated_posts), fresh, "" if attrs["complete"] else " (stopped early)")
+        record_listing(subreddit_name, sort_method, time_filter, validated_posts, estimate_video_duration,
+                       complete=attrs["complete"])
+        return len(validated_posts)
         
-        # Remove duplicates based on post ID
-        unique_posts = {post.id: post for post in all_posts}.values()
-        unique_posts = list(unique_posts)
+    except Exception as e:
+        print(f"    Error fetching r/{subreddit_name} {description}: {e}")
+        return 0
+
+def get_listing_pool():
+    """
+    Thread pool for listing fetches, kept for the life of the process so its threads'
+    Reddit clients (and their HTTP connections) are reused by later refreshes.
+    """
+    global _listing_pool
+    with _listing_pool_lock:
+        if _listing_pool is None:
+            _listing_pool = ThreadPoolExecutor(max_workers=MAX_LISTING_WORKERS, thread_name_prefix="listing")
+        return _listing_pool
+
+def refresh_listings(subreddits, target=CANDIDATE_TARGET):
+    """
+    Re-fetch the stale listings of the subreddits concurrently, until `target` fresh candidates
+    are available (skipped entirely when the candidate index already has that many).
+    """
+    stale_listings = []
+    for subreddit_name in subreddits:
+        for sort_method, time_filter, limit, description in SEARCH_STRATEGIES:
+            if is_listing_fresh(subreddit_name, sort_method, time_filter):
+                logger.debug("    r/%s %s (cached)", subreddit_name, description)
+            else:
+                stale_listings.append((subreddit_name, sort_method, time_filter, limit, description))
+    
+    if not stale_listings:
+        return
+    
+    indexed_ids = {post.id for post in query_candidates(subreddits)}
+    excluded_ids = load_used_stories() | load_blacklisted_stories()
+    needed = target - len(indexed_ids - excluded_ids)
+    if needed <= 0:
+        print(f"  ⚡ {target}+ fresh candidates already indexed, not fetching {len(stale_listings)} stale listings")
+        return
+    
+    print(f"  ⚡ Fetching {len(stale_listings)} listings concurrently (until {needed} new candidates)...")
+    collector = CandidateCollector(needed, indexed_ids | excluded_ids)
+    pool = get_listing_pool()
+    futures = [pool.submit(metrics.bind(fetch_listing), *listing, collector) for listing in stale_listings]
+    for future in as_completed(futures):
+        future.result()
+    
+    spread = collector.spread()
+    stopped = " (stopped early)" if collector.stop.is_set() else ""
+    print(f"  📥 {len(collector.new_ids)} new candidates from {collector.pulled} posts "
+          f"({collector.qualified} qualified){stopped}")
+    if spread:
+        print(f"  📊 New candidate scores: {spread[0]} / {spread[1]} / {spread[2]} (min / median / max)")
+
+_candidate_pools = {}
+_candidate_pools_lock = threading.Lock()
+
+def load_fresh_candidates(subreddits):
+    """Refresh stale listings if needed, then return the indexed candidates not used or blacklisted."""
+    refresh_listings(subreddits)
+    with metrics.span("selection", subreddits=len(subreddits)) as selection_attrs:
+        unique_posts = query_candidates(subreddits)
         
         # Filter out previously used and blacklisted stories
         used_stories = load_used_stories()
@@ -222,71 +402,98 @@ def fetch_story_from_subreddit(subreddit_name):
         print(f"📚 Found {len(used_stories)} previously used stories")
         print(f"🚫 Found {len(blacklisted_stories)} blacklisted stories")
         
-        # Filter out both used and blacklisted stories
-        fresh_posts = [post for post in unique_posts 
-                      if post.id not in used_stories and post.id not in blacklisted_stories]
+        fresh_posts = [post for post in unique_posts
+                       if post.id not in used_stories and post.id not in blacklisted_stories]
+        selection_attrs["candidates"] = len(unique_posts)
+        selection_attrs["fresh"] = len(fresh_posts)
         print(f"🆕 {len(fresh_posts)} fresh posts available out of {len(unique_posts)} total")
+        return fresh_posts
+
+def get_candidate_pool(subreddits):
+    """Session candidate pool for a subreddit selection (one per process, see candidate_pool.py)."""
+    key = tuple(sorted(name.lower() for name in subreddits))
+    with _candidate_pools_lock:
+        pool = _candidate_pools.get(key)
+        if pool is None:
+            pool = _candidate_pools[key] = CandidatePool(lambda: load_fresh_candidates(subreddits))
+        return pool
+
+def fetch_story_from_multiple_subreddits(subreddits):
+    """
+    Draw a story from the session candidate pool of the selected subreddits. Listings and
+    the candidate index are only consulted when the pool is empty, low or old.
+    """
+    try:
+        print(f"🔍 Searching {', '.join(f'r/{name}' for name in subreddits)}...")
+        print("  🎯 Quality-focused search - prioritizing high-scoring posts...")
+        
+        pool = get_candidate_pool(subreddits)
+        # Stories used or blacklisted by other processes since the pool was loaded are skipped
+        excluded_ids = load_used_stories() | load_blacklisted_stories()
+        picked = pool.take(excluded_ids)
         
         # If we've used all stories, clear the used stories file and start fresh
-        if not fresh_posts:
+        if picked is None:
             print("All recent stories have been used, clearing history and fetching new content...")
-            # Clear the used stories file
             try:
-                with open(USED_STORIES_FILE, 'w') as f:
-                    json.dump({'used_ids': []}, f)
+                used_stories_store.clear()
+                reset_used_candidates()
                 print("✅ Story history cleared")
             except Exception as e:
                 print(f"Error clearing story history: {e}")
-            
-            fresh_posts = unique_posts
+            pool.refill()
+            picked = pool.take(load_blacklisted_stories())
         
-        if fresh_posts:
-            # Quality-weighted selection: favor higher-scoring posts
-            selected_post = select_quality_weighted_story(fresh_posts)
-            
-            # Mark this story as used
-            save_used_story(selected_post.id)
-            
-            story_data = {
-                "title": selected_post.title,
-                "body": selected_post.selftext,
-                "score": selected_post.score,
-                "comments": selected_post.num_comments,
-                "url": f"https://reddit.com{selected_post.permalink}",
-                "id": selected_post.id,
-                "subreddit": subreddit_name
-            }
-            
-            _, duration = validate_story_length(story_data)
-            print(f"✅ Selected story from r/{subreddit_name}: '{selected_post.title[:50]}...'")
-            print(f"⏱️ Duration: {duration:.1f}s | Score: {selected_post.score} (QUALITY-WEIGHTED)")
-            
-            return story_data
-        else:
-            print(f"No valid stories found in r/{subreddit_name}")
+        if picked is None:
+            print("❌ No suitable stories found in any subreddit")
             return None
+        
+        selected_post, selection_probability = picked
+        print(f"  🎯 Selected post with score {selected_post.score} ({selection_probability * 100:.1f}% selection "
+              f"probability, {len(pool)} left in pool)")
+        
+        # Mark this story as used
+        save_used_story(selected_post.id)
+        
+        # The index stores subreddit names lowercased, report them as the user typed them
+        subreddit_names = {name.lower(): name for name in subreddits}
+        subreddit_name = subreddit_names.get(selected_post.subreddit, selected_post.subreddit)
+        
+        story_data = {
+            "title": selected_post.title,
+            "body": selected_post.selftext,
+            "score": selected_post.score,
+            "comments": selected_post.num_comments,
+            "url": f"https://reddit.com{selected_post.permalink}",
+            "id": selected_post.id,
+            "subreddit": subreddit_name
+        }
+        
+        _, duration = validate_story_length(story_data)
+        print(f"✅ Selected story from r/{subreddit_name}: '{selected_post.title[:50]}...'")
+        print(f"⏱️ Duration: {duration:.1f}s | Score: {selected_post.score} (QUALITY-WEIGHTED)")
+        
+        return story_data
     except Exception as e:
-        print(f"Error fetching from r/{subreddit_name}: {e}")
+        print(f"Error fetching stories: {e}")
         return None
 
-# Initialize TikTok TTS
-tiktok_tts = TikTokTTS()
+def fetch_story_from_subreddit(subreddit_name):
+    """Fetch a story from a specific subreddit with quality-focused selection."""
+    return fetch_story_from_multiple_subreddits([subreddit_name])
+
+@functools.lru_cache(maxsize=None)
+def get_tiktok_tts():
+    """TikTok TTS client, created on first use."""
+    from tiktok_voice_api import TikTokTTS
+    
+    return TikTokTTS()
 
 # Helper functions for tracking used stories
 def load_used_stories():
-    """Load the list of previously used story IDs."""
+    """Load the set of story IDs used within the last 7 days."""
     try:
-        if os.path.exists(USED_STORIES_FILE):
-            with open(USED_STORIES_FILE, 'r') as f:
-                data = json.load(f)
-                # Clean old entries (older than 7 days)
-                current_time = time.time()
-                data['used_ids'] = [
-                    entry for entry in data.get('used_ids', [])
-                    if current_time - entry.get('timestamp', 0) < 7 * 24 * 3600
-                ]
-                return set(entry['id'] for entry in data['used_ids'])
-        return set()
+        return used_stories_store.ids()
     except Exception as e:
         print(f"Error loading used stories: {e}")
         return set()
@@ -294,24 +501,8 @@ def load_used_stories():
 def save_used_story(story_id):
     """Save a story ID as used (prevent duplicates)."""
     try:
-        # Load existing data
-        data = {'used_ids': []}
-        if os.path.exists(USED_STORIES_FILE):
-            with open(USED_STORIES_FILE, 'r') as f:
-                data = json.load(f)
-        
-        # Check if story is already saved
-        existing_ids = [entry['id'] for entry in data.get('used_ids', [])]
-        if story_id not in existing_ids:
-            # Add new story only if not already present
-            data['used_ids'].append({
-                'id': story_id,
-                'timestamp': time.time()
-            })
-            
-            # Save back
-            with open(USED_STORIES_FILE, 'w') as f:
-                json.dump(data, f)
+        if used_stories_store.add(story_id):
+            set_candidate_status(story_id, STATUS_USED)
             print(f"✅ Story {story_id} marked as used")
         else:
             print(f"⚠️ Story {story_id} already marked as used")
@@ -438,26 +629,37 @@ def load_last_voice():
         print(f"Error loading last voice: {e}")
         return None
 
-def save_last_voice(voice_id):
-    """Save the last used voice."""
+def load_last_voice_story():
+    """Story ID the last used voice was picked for (None if unknown)."""
+    try:
+        if os.path.exists(LAST_VOICE_FILE):
+            with open(LAST_VOICE_FILE, 'r') as f:
+                return json.load(f).get('story_id')
+        return None
+    except Exception as e:
+        print(f"Error loading last voice: {e}")
+        return None
+
+def save_last_voice(voice_id, story_id=None):
+    """Save the last used voice (and the story it narrated)."""
     try:
         data = {
             'last_voice': voice_id,
+            'story_id': story_id,
             'timestamp': time.time()
         }
-        with open(LAST_VOICE_FILE, 'w') as f:
+        # Batch workers narrate at the same time; write a private temp file and swap it in whole
+        temp_file = f"{LAST_VOICE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'w') as f:
             json.dump(data, f)
+        os.replace(temp_file, LAST_VOICE_FILE)
     except Exception as e:
         print(f"Error saving last voice: {e}")
 
 def load_blacklisted_stories():
-    """Load the list of blacklisted story IDs."""
+    """Load the set of blacklisted story IDs."""
     try:
-        if os.path.exists(BLACKLISTED_STORIES_FILE):
-            with open(BLACKLISTED_STORIES_FILE, 'r') as f:
-                data = json.load(f)
-                return set(entry['id'] for entry in data.get('blacklisted_ids', []))
-        return set()
+        return blacklisted_stories_store.ids()
     except Exception as e:
         print(f"Error loading blacklisted stories: {e}")
         return set()
@@ -465,25 +667,8 @@ def load_blacklisted_stories():
 def save_blacklisted_story(story_id, title):
     """Save a story ID as blacklisted (permanently rejected)."""
     try:
-        # Load existing data
-        data = {'blacklisted_ids': []}
-        if os.path.exists(BLACKLISTED_STORIES_FILE):
-            with open(BLACKLISTED_STORIES_FILE, 'r') as f:
-                data = json.load(f)
-        
-        # Check if story is already blacklisted
-        existing_ids = [entry['id'] for entry in data.get('blacklisted_ids', [])]
-        if story_id not in existing_ids:
-            # Add new blacklisted story
-            data['blacklisted_ids'].append({
-                'id': story_id,
-                'title': title,
-                'timestamp': time.time()
-            })
-            
-            # Save back
-            with open(BLACKLISTED_STORIES_FILE, 'w') as f:
-                json.dump(data, f)
+        if blacklisted_stories_store.add(story_id, title=title):
+            set_candidate_status(story_id, STATUS_BLACKLISTED)
             print(f"🚫 Story {story_id} blacklisted: '{title[:50]}...'")
         else:
             print(f"⚠️ Story {story_id} already blacklisted")
@@ -493,12 +678,12 @@ def save_blacklisted_story(story_id, title):
 
 def ask_user_approval(story):
     """Ask user if they want to create a video with this story."""
-    print(f"\n" + "="*60)
-    print(f"📖 STORY PREVIEW:")
+    print("\n" + "="*60)
+    print("📖 STORY PREVIEW:")
     print(f"Title: {story['title']}")
     print(f"Score: {story['score']} upvotes | Comments: {story['comments']}")
     print(f"URL: {story['url']}")
-    print(f"\n📝 Content Preview:")
+    print("\n📝 Content Preview:")
     print("-" * 40)
     
     # Show first 300 characters of the story
@@ -528,6 +713,17 @@ def ask_user_approval(story):
         else:
             print("Please enter 'y' for yes, 'n' for no, or 'q' to quit.")
 
+# Edge-TTS narration is sped up to this tempo (TikTok voices are used as-is)
+EDGE_TTS_TEMPO = 1.3
+
+# Narration is synthesized in sentence-aligned chunks of at most this many characters per engine
+TTS_CHUNK_LIMITS = {"tiktok": 300, "edge": 1000}
+TTS_MAX_WORKERS = 4
+CAPTION_RENDER_WORKERS = 2  # Caption rasterization threads running alongside TTS
+
+# Finished narration, keyed by text/engine/voice/tempo (see tts_cache.py)
+tts_cache = TTSCache()
+
 # Helper function to generate narration audio using TikTok TTS
 def generate_tiktok_narration(text, output_file="narration.mp3", voice="en_us_rocket"):
     """Generate audio from text using TikTok's actual TTS voices."""
@@ -535,7 +731,7 @@ def generate_tiktok_narration(text, output_file="narration.mp3", voice="en_us_ro
         output_file = os.path.join(os.getcwd(), output_file)
         
         # Generate TikTok TTS audio
-        result = tiktok_tts.generate_speech(text, voice, output_file)
+        result = get_tiktok_tts().generate_speech(text, voice, output_file)
         
         if result and os.path.exists(result):
             return result
@@ -547,73 +743,317 @@ def generate_tiktok_narration(text, output_file="narration.mp3", voice="en_us_ro
         print(f"Error generating TikTok narration: {e}")
         return None
 
-# Helper function to generate narration audio using Edge-TTS (fallback)
-async def generate_narration_async(text, output_file="narration.mp3", voice="en-US-AndrewNeural"):
-    """Generate audio from text using Edge-TTS with natural voices."""
+# Edge-TTS streams constant-bitrate MP3 (audio-24khz-48kbitrate-mono-mp3), so duration = bytes / rate
+EDGE_TTS_BITRATE = 48000
+
+async def stream_edge_tts(text, voice, word_timings=None, tempo=1.0):
+    """
+    Yield Edge-TTS MP3 bytes as they arrive. If word_timings is a list, WordBoundary events
+    are appended to it as {'text', 'start', 'end'} dicts (seconds, scaled for tempo).
+    """
+    import edge_tts
+    
+    # edge-tts 7+ only reports sentences unless asked for words
     try:
-        output_file = os.path.join(os.getcwd(), output_file)
-        
-        # Create TTS communication
+        communicate = edge_tts.Communicate(text, voice, boundary="WordBoundary")
+    except TypeError:
         communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_file)
-        
-        # Speed up the audio by 1.3x for faster narration (increased from 1.2x)
-        temp_file = output_file.replace('.mp3', '_temp.mp3')
-        os.rename(output_file, temp_file)
-        
-        # Use FFmpeg to speed up audio more for longer stories
-        import subprocess
-        subprocess.run([
-            'ffmpeg', '-i', temp_file, '-filter:a', 'atempo=1.3', 
-            '-y', output_file
-        ], capture_output=True)
-        
-        # Clean up temp file
-        os.remove(temp_file)
-        
+    
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            yield chunk["data"]
+        elif chunk["type"] == "WordBoundary" and word_timings is not None:
+            # Offsets are in 100 ns ticks
+            start = chunk["offset"] / 1e7 / tempo
+            word_timings.append({
+                'text': chunk["text"],
+                'start': start,
+                'end': start + chunk["duration"] / 1e7 / tempo,
+            })
+
+def tempo_command(output_file, tempo):
+    """ffmpeg command that reads MP3 on stdin, applies atempo and writes output_file once."""
+    return ['ffmpeg', '-y', '-v', 'error', '-f', 'mp3', '-i', 'pipe:0',
+            '-filter:a', f'atempo={tempo}', '-c:a', 'libmp3lame', '-q:a', '2', output_file]
+
+def write_narration_audio(audio_bytes, output_file, tempo=1.0):
+    """Write in-memory MP3 narration to output_file, piping it through ffmpeg if tempo != 1.0."""
+    if tempo == 1.0:
+        with open(output_file, "wb") as f:
+            f.write(audio_bytes)
         return output_file
-    except Exception as e:
-        print(f"Error generating narration: {e}")
+    
+    result = subprocess.run(tempo_command(output_file, tempo), input=audio_bytes, capture_output=True)
+    if result.returncode != 0:
+        print(f"Error adjusting narration tempo: {result.stderr.decode(errors='replace').strip()[-500:]}")
+        return None
+    return output_file
+
+def split_text_for_tts(text, max_chars):
+    """Split text at sentence boundaries into chunks of at most max_chars characters."""
+    chunks = []
+    current_chunk = ""
+    
+    for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+        # A single sentence over the limit is broken at word boundaries
+        pieces = [sentence] if len(sentence) <= max_chars else textwrap.wrap(sentence, max_chars)
+        for piece in pieces:
+            if current_chunk and len(current_chunk) + 1 + len(piece) > max_chars:
+                chunks.append(current_chunk)
+                current_chunk = piece
+            else:
+                current_chunk = f"{current_chunk} {piece}".strip()
+    
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+async def _synthesize_edge_chunks(chunks, voice, chunk_words):
+    """Synthesize Edge-TTS chunks concurrently into memory (at most TTS_MAX_WORKERS in flight)."""
+    semaphore = asyncio.Semaphore(TTS_MAX_WORKERS)
+    
+    async def synthesize(chunk, words):
+        async with semaphore:
+            try:
+                return b"".join([data async for data in stream_edge_tts(chunk, voice, words)])
+            except Exception as e:
+                print(f"Error generating narration: {e}")
+                return None
+    
+    return await asyncio.gather(*(synthesize(chunk, words) for chunk, words in zip(chunks, chunk_words)))
+
+def synthesize_tts_chunks(chunks, chunk_dir, voice):
+    """Synthesize TikTok chunks in parallel. Returns the chunk files in order, or None if any failed."""
+    chunk_files = [os.path.join(chunk_dir, f"chunk_{i:03d}.mp3") for i in range(len(chunks))]
+    
+    with ThreadPoolExecutor(max_workers=min(TTS_MAX_WORKERS, len(chunks))) as pool:
+        results = list(pool.map(
+            lambda args: generate_tiktok_narration(args[0], args[1], voice), zip(chunks, chunk_files)
+        ))
+    
+    if not all(results):
+        print(f"❌ {results.count(None)} of {len(chunks)} TTS chunks failed")
         return None
+    return results
 
-def generate_narration(text, output_file="narration.mp3", voice="en-US-AndrewNeural", use_tiktok=True):
-    """Wrapper function to generate narration with TikTok or Edge-TTS."""
+def synthesize_edge_chunks(chunks, voice, chunk_words):
+    """
+    Synthesize Edge-TTS chunks in parallel, in memory. Returns the MP3 bytes of each
+    chunk in order, or None if any failed. chunk_words (one list per chunk) receives word timings.
+    """
+    results = asyncio.run(_synthesize_edge_chunks(chunks, voice, chunk_words))
+    
+    if not all(results):
+        print(f"❌ {sum(1 for r in results if not r)} of {len(chunks)} TTS chunks failed")
+        return None
+    return results
+
+def join_audio_chunks(chunk_files, output_file, tempo=1.0):
+    """Concatenate chunk audio into one gapless track (and apply tempo) in a single ffmpeg encode."""
+    if len(chunk_files) == 1 and tempo == 1.0:
+        os.replace(chunk_files[0], output_file)
+        return output_file
+    
+    command = ['ffmpeg', '-y', '-v', 'error']
+    for chunk_file in chunk_files:
+        command += ['-i', chunk_file]
+    inputs = "".join(f"[{i}:a]" for i in range(len(chunk_files)))
+    audio_filter = f"{inputs}concat=n={len(chunk_files)}:v=0:a=1"
+    if tempo != 1.0:
+        audio_filter += f",atempo={tempo}"
+    command += ['-filter_complex', audio_filter + "[audio]", '-map', '[audio]',
+                '-c:a', 'libmp3lame', '-q:a', '2', output_file]
+    
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Error joining narration chunks: {result.stderr.strip()[-500:]}")
+        return None
+    return output_file
+
+def generate_narration(text, output_file="narration.mp3", voice="en-US-AndrewNeural", use_tiktok=True,
+                       with_timing=False):
+    """
+    Wrapper function to generate narration with TikTok or Edge-TTS.
+    The text is synthesized in parallel, sentence-aligned chunks. With with_timing=True
+    returns (path, timing) where timing["anchors"] holds each chunk's start/end in the track
+    and, for Edge-TTS, timing["words"] the start/end of every spoken word.
+    """
     print(f"Generating narration with {'TikTok' if use_tiktok else 'Edge-TTS'} voice: {voice}")
     print(f"Text length: {len(text)} characters")
     
-    if use_tiktok:
-        result = generate_tiktok_narration(text, output_file, voice)
-        print(f"TikTok TTS result: {result}")
-        return result
-    else:
-        result = asyncio.run(generate_narration_async(text, output_file, voice))
-        print(f"Edge-TTS result: {result}")
-        return result
+    with metrics.span("tts", engine="tiktok" if use_tiktok else "edge", voice=voice, chars=len(text)) as tts_attrs:
+        # Same text + engine + voice + tempo always gives the same audio, reuse it if we have it
+        engine = "tiktok" if use_tiktok else "edge"
+        tempo = 1.0 if use_tiktok else EDGE_TTS_TEMPO
+        cache_key = tts_cache_key(text, engine, voice, tempo)
+        output_path = os.path.join(os.getcwd(), output_file)
+        timing = tts_cache.get(cache_key, output_path)
+        if timing is not None:
+            print(f"♻️ Reusing cached narration ({cache_key[:12]})")
+            tts_attrs["cache_hits"] = 1
+            return (output_path, timing) if with_timing else output_path
+    
+        chunks = split_text_for_tts(text, TTS_CHUNK_LIMITS[engine])
+        print(f"Synthesizing {len(chunks)} chunks with up to {TTS_MAX_WORKERS} parallel requests")
+    
+        chunk_dir = tempfile.mkdtemp(prefix="tts-", dir=os.path.dirname(output_path))
+        result = None
+        timing = {}
+        try:
+            chunk_words = [[] for _ in chunks]
+            chunk_durations = None
+            if chunks and use_tiktok:
+                chunk_files = synthesize_tts_chunks(chunks, chunk_dir, voice)
+                if chunk_files:
+                    chunk_durations = [probe_duration(chunk_file) for chunk_file in chunk_files]
+                    result = join_audio_chunks(chunk_files, output_path, tempo)
+            elif chunks:
+                # Edge MP3 frames concatenate cleanly: one in-memory stream, one ffmpeg pass for the tempo
+                chunk_audio = synthesize_edge_chunks(chunks, voice, chunk_words)
+                if chunk_audio:
+                    chunk_durations = [len(audio) * 8 / EDGE_TTS_BITRATE for audio in chunk_audio]
+                    result = write_narration_audio(b"".join(chunk_audio), output_path, tempo)
+        
+            if result and chunk_durations:
+                # Chunk boundaries and word times in the final (tempo-adjusted) track, for caption timing
+                anchors = []
+                words = []
+                current_time = 0.0
+                for chunk, chunk_duration, chunk_word_list in zip(chunks, chunk_durations, chunk_words):
+                    duration = chunk_duration / tempo
+                    anchors.append({'text': chunk, 'start': current_time, 'end': current_time + duration})
+                    for word in chunk_word_list:
+                        words.append({'text': word['text'],
+                                      'start': current_time + word['start'] / tempo,
+                                      'end': current_time + word['end'] / tempo})
+                    current_time += duration
+                timing = {'anchors': anchors}
+                if words:
+                    timing['words'] = words
+        except Exception as e:
+            print(f"Error generating narration: {e}")
+            result = None
+        finally:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+    
+        print(f"{'TikTok' if use_tiktok else 'Edge-TTS'} result: {result}")
+        if result and os.path.exists(result):
+            tts_cache.put(cache_key, result, timing)
+            tts_attrs["chunks"] = len(chunks)
+            tts_attrs["bytes"] = os.path.getsize(result)
+        return (result, timing) if with_timing else result
+
+def split_caption_sentences(text):
+    """Split text into caption sentences (natural breaks at . ! ? once a sentence has >10 chars)."""
+    sentences = []
+    current_sentence = ""
+    
+    # Pieces ending in a sentence mark, plus whatever trails the last one
+    for piece in re.findall(r'[^.!?]*[.!?]|[^.!?]+$', text):
+        current_sentence += piece
+        if current_sentence[-1:] in ('.', '!', '?') and len(current_sentence.strip()) > 10:
+            sentences.append(current_sentence.strip())
+            current_sentence = ""
+    
+    # Add remaining text
+    if current_sentence.strip():
+        sentences.append(current_sentence.strip())
+    
+    return sentences
+
+def align_caption_segments(text, segments, words, audio_duration):
+    """
+    Start/end of each caption segment from word-boundary timings. Each caption stays up
+    until the next one starts. Returns None if some segment has no matched word.
+    """
+    # Character position of every spoken word in the text (whole words only, "she" never matches "shed")
+    word_positions = []
+    cursor = 0
+    for word in words:
+        match = re.compile(rf"(?<!\w){re.escape(word['text'])}(?!\w)", re.IGNORECASE).search(text, cursor)
+        if not match or match.start() - cursor > 100:
+            continue  # Not in the text (or matched far ahead), skip it
+        word_positions.append((match.start(), word['start']))
+        cursor = match.end()
+    
+    # Segments are consecutive, so each one is searched for after the end of the previous one
+    segment_starts = []
+    cursor = 0
+    for segment in segments:
+        tokens = segment['text'].split()
+        if not tokens:
+            return None
+        pattern = r"(?<!\w)" + r"\s+".join(re.escape(token) for token in tokens)
+        match = re.compile(pattern, re.IGNORECASE).search(text, cursor)
+        if not match:
+            return None
+        segment_starts.append(match.start())
+        cursor = match.end()
+    
+    times = []
+    word_index = 0
+    for i, segment_start in enumerate(segment_starts):
+        segment_end = segment_starts[i + 1] if i + 1 < len(segment_starts) else len(text)
+        while word_index < len(word_positions) and word_positions[word_index][0] < segment_start:
+            word_index += 1
+        if word_index >= len(word_positions) or word_positions[word_index][0] >= segment_end:
+            return None
+        times.append(word_positions[word_index][1])
+    
+    return [(start, times[i + 1] if i + 1 < len(times) else audio_duration) for i, start in enumerate(times)]
+
+def locate_text_spans(text, pieces):
+    """(start, end) of each piece in text, searched in order and ignoring whitespace differences, or None."""
+    spans = []
+    cursor = 0
+    for piece in pieces:
+        tokens = piece.split()
+        if not tokens:
+            return None
+        match = re.compile(r"\s+".join(re.escape(token) for token in tokens)).search(text, cursor)
+        if not match:
+            return None
+        spans.append(match.span())
+        cursor = match.end()
+    return spans
+
+def anchored_time(position, chunk_spans, chunk_anchors):
+    """Time at a character position, interpolated inside the TTS chunk that contains it."""
+    for (start, end), anchor in zip(chunk_spans, chunk_anchors):
+        if position <= end:
+            fraction = min(1.0, max(0.0, (position - start) / max(1, end - start)))
+            return anchor['start'] + fraction * (anchor['end'] - anchor['start'])
+    return chunk_anchors[-1]['end']
 
 # Helper function to analyze audio and create accurate captions
-def analyze_audio_timing(audio_file, text):
-    """Analyze audio file to get accurate timing for captions."""
+def analyze_audio_timing(audio_file, text, audio_duration=None, chunk_anchors=None):
+    """
+    Estimate caption timing from sentence length (used when no word timings are available).
+    chunk_anchors (each TTS chunk's start/end, from generate_narration) pin every sentence to
+    the chunk it was spoken in, so a chunk read faster or slower does not shift the rest.
+    """
     try:
-        from moviepy.editor import AudioFileClip
-        
-        # Load audio to get actual duration
-        audio = AudioFileClip(audio_file)
-        actual_duration = audio.duration
+        # Container duration only, no decode
+        actual_duration = audio_duration if audio_duration is not None else probe_duration(audio_file)
         
         # Split text into sentences for natural breaks
-        sentences = []
-        current_sentence = ""
-        
-        # Split by common sentence endings
-        for char in text:
-            current_sentence += char
-            if char in '.!?' and len(current_sentence.strip()) > 10:
-                sentences.append(current_sentence.strip())
-                current_sentence = ""
-        
-        # Add remaining text
-        if current_sentence.strip():
-            sentences.append(current_sentence.strip())
+        sentences = split_caption_sentences(text)
+        
+        chunk_spans = locate_text_spans(text, [anchor['text'] for anchor in chunk_anchors]) if chunk_anchors else None
+        sentence_spans = locate_text_spans(text, sentences) if chunk_spans else None
+        if sentence_spans:
+            # Each sentence stays up until the next one starts
+            starts = [anchored_time(start, chunk_spans, chunk_anchors) for start, end in sentence_spans]
+            ends = starts[1:] + [anchored_time(sentence_spans[-1][1], chunk_spans, chunk_anchors)]
+            timings = []
+            for sentence, start_time, end_time in zip(sentences, starts, ends):
+                timings.append({
+                    'text': sentence,
+                    'start': start_time,
+                    'duration': end_time - start_time,
+                    'end': end_time
+                })
+            return timings, actual_duration
         
         # Calculate timing based on sentence length (more accurate)
         total_chars = sum(len(s) for s in sentences)
@@ -668,43 +1108,116 @@ def wrap_text_to_width(text, font, max_width, draw):
     
     return '\n'.join(lines)
 
+# Popular TikTok fonts in order of preference (file names, searched in the system font dirs)
+TIKTOK_FONT_FILES = [
+    "impact.ttf",        # Impact - very popular for TikTok
+    "arialbd.ttf",       # Arial Bold - clean and bold
+    "arial bold.ttf",    # Arial Bold (macOS name)
+    "arial.ttf",         # Arial - fallback
+    "calibrib.ttf",      # Calibri Bold - modern
+    "verdanab.ttf",      # Verdana Bold - readable
+    "arial-bold.ttf",
+    "liberationsans-bold.ttf",  # Metric-compatible Arial Bold on Linux
+    "dejavusans-bold.ttf",
+]
+
+def get_font_search_dirs():
+    """Return the system font directories for the current platform."""
+    home = os.path.expanduser("~")
+    if os.name == 'nt':
+        return [
+            os.path.join(os.environ.get("WINDIR", "C:/Windows"), "Fonts"),
+            os.path.join(os.environ.get("LOCALAPPDATA", home), "Microsoft", "Windows", "Fonts"),
+        ]
+    return [
+        "/Library/Fonts",
+        "/System/Library/Fonts",
+        "/System/Library/Fonts/Supplemental",
+        os.path.join(home, "Library", "Fonts"),
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts"),
+    ]
+
+@functools.lru_cache(maxsize=None)
+def resolve_caption_font_path():
+    """Find the preferred caption font once per process (None if no TikTok font is installed)."""
+    available = {}
+    for font_dir in [os.path.join(os.getcwd(), "static", "fonts")] + get_font_search_dirs():
+        for root, _, files in os.walk(font_dir):
+            for name in files:
+                available.setdefault(name.lower(), os.path.join(root, name))
+    
+    for font_name in TIKTOK_FONT_FILES:
+        if font_name in available:
+            print(f"✅ Using TikTok font: {available[font_name]}")
+            return available[font_name]
+    
+    print("⚠️ Using default font (TikTok fonts not found)")
+    return None
+
+@functools.lru_cache(maxsize=None)
+def get_caption_font(font_size):
+    """Return a cached FreeTypeFont for the resolved caption font at the given size."""
+    from PIL import ImageFont
+    
+    font_path = resolve_caption_font_path()
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, font_size)
+        except OSError as e:
+            print(f"Error loading font {font_path}: {e}")
+    # Ultimate fallback
+    return ImageFont.load_default()
+
+def outline_mask(mask, radius):
+    """
+    Alpha of a 2D mask drawn at every dx/dy offset within radius (except 0, 0), combined the
+    way overlapping draws combine: 1 - product of (1 - shifted mask).
+    """
+    import numpy as np
+    
+    height, width = mask.shape
+    transparency = np.ones_like(mask)
+    for dx in range(-radius, radius + 1):
+        for dy in range(-radius, radius + 1):
+            if dx == 0 and dy == 0:
+                continue
+            target = transparency[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)]
+            target *= 1.0 - mask[max(-dy, 0):height + min(-dy, 0), max(-dx, 0):width + min(-dx, 0)]
+    return 1.0 - transparency
+
+def render_outlined_text(size, position, text, font, outline_width):
+    """Rasterize white text with a black outline from one glyph render and shifted copies of its mask."""
+    import numpy as np
+    from PIL import Image, ImageDraw
+    
+    # Render the glyphs once as an alpha mask
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).multiline_text(position, text, font=font, fill=255, align='center')
+    fill_alpha = np.asarray(mask, dtype=np.float32) / 255.0
+    
+    # Outline = the mask at every offset up to outline_width, white fill composited on top
+    outline_alpha = outline_mask(fill_alpha, outline_width)
+    alpha = fill_alpha + outline_alpha * (1.0 - fill_alpha)
+    white = np.divide(fill_alpha, alpha, out=np.zeros_like(alpha), where=alpha > 0)
+    
+    img = np.empty((size[1], size[0], 4), dtype=np.uint8)
+    img[..., :3] = np.rint(white * 255)[..., None]
+    img[..., 3] = np.rint(alpha * 255)
+    return img
+
 def create_caption_image(text, width=700, height=250):
     """Create a caption image with exact text fitting and 4px padding minimum."""
+    from PIL import Image, ImageDraw
+    
     try:
         # First, create a temporary image to measure text size
         temp_img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
         temp_draw = ImageDraw.Draw(temp_img)
         
-        # Popular TikTok fonts in order of preference
-        tiktok_fonts = [
-            # TikTok's preferred fonts
-            "C:/Windows/Fonts/impact.ttf",      # Impact - very popular for TikTok
-            "C:/Windows/Fonts/arialbd.ttf",     # Arial Bold - clean and bold
-            "C:/Windows/Fonts/arial.ttf",       # Arial - fallback
-            "C:/Windows/Fonts/calibrib.ttf",    # Calibri Bold - modern
-            "C:/Windows/Fonts/verdanab.ttf",    # Verdana Bold - readable
-            # Generic names that might work
-            "impact.ttf",
-            "arial-bold.ttf", 
-            "arial.ttf"
-        ]
-        
-        font = None
-        font_size = 48  # Even larger for better visibility
-        
-        # Try each font until one works
-        for font_path in tiktok_fonts:
-            try:
-                font = ImageFont.truetype(font_path, font_size)
-                print(f"✅ Using TikTok font: {font_path}")
-                break
-            except:
-                continue
-        
-        # Ultimate fallback
-        if font is None:
-            font = ImageFont.load_default()
-            print("⚠️ Using default font (TikTok fonts not found)")
+        font = get_caption_font(48)  # Even larger for better visibility
         
         # Smart text wrapping to prevent cropping
         max_width = width - 20  # Leave 10px margin on each side for wrapping
@@ -728,30 +1241,13 @@ def create_caption_image(text, width=700, height=250):
         final_width = max(width, text_width + padding)
         final_height = max(height, text_height + padding + descender_extra + 8)  # Extra 8px for safety
         
-        # Create the actual image with proper size
-        img = Image.new('RGBA', (final_width, final_height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
         # Center text with guaranteed padding and descender space
         x = (final_width - text_width) // 2
         y = max(8, (final_height - text_height - descender_extra) // 2)  # Ensure top padding and descender space
         
-        # TikTok-style text with thick black outline
+        # TikTok-style white text with thick black outline, rasterized in a single pass
         outline_width = 3  # Thicker outline for TikTok style
-        
-        # Draw black outline (multiple passes for thickness)
-        for dx in range(-outline_width, outline_width + 1):
-            for dy in range(-outline_width, outline_width + 1):
-                if dx != 0 or dy != 0:
-                    draw.multiline_text((x + dx, y + dy), wrapped_text, font=font, 
-                                      fill=(0, 0, 0, 255), align='center')
-        
-        # Draw bright white text on top (TikTok style)
-        draw.multiline_text((x, y), wrapped_text, font=font, 
-                          fill=(255, 255, 255, 255), align='center')
-        
-        # Convert to numpy array for MoviePy
-        return np.array(img)
+        return render_outlined_text((final_width, final_height), (x, y), wrapped_text, font, outline_width)
         
     except Exception as e:
         print(f"Error creating caption image: {e}")
@@ -784,63 +1280,91 @@ def split_long_caption(text, max_chars=80):
     second_part = ' '.join(words[mid_point:])
     return [first_part, second_part]
 
-def create_accurate_captions(text, audio_file, video_size):
-    """Create captions with accurate timing and smart text splitting."""
+def layout_caption_segments(text):
+    """
+    Text-only caption layout: one segment per sentence, or two half-length parts for long ones.
+    Depends only on the text, so rasterization can start before the narration exists.
+    """
+    segments = []
+    for sentence_index, sentence in enumerate(split_caption_sentences(text)):
+        # Check if caption is too long and needs splitting
+        caption_parts = split_long_caption(sentence, max_chars=60)
+        for part_index, part_text in enumerate(caption_parts):
+            segments.append({
+                'sentence': sentence_index,
+                'part': part_index,
+                'parts': len(caption_parts),
+                'text': part_text,
+                'height': 100 if len(caption_parts) == 1 else 80,
+            })
+    return segments
+
+def create_accurate_captions(text, audio_file, video_size, audio_duration=None, caption_images=None,
+                             word_timings=None, chunk_anchors=None):
+    """
+    Create captions with accurate timing and smart text splitting.
+    caption_images may hold pre-rasterized images (or futures) for layout_caption_segments(text).
+    word_timings (Edge-TTS word boundaries) give exact caption times; without them times are estimated,
+    within each TTS chunk when chunk_anchors are given.
+    """
     try:
-        # Analyze audio for accurate timing
-        timings, duration = analyze_audio_timing(audio_file, text)
+        segments = layout_caption_segments(text)
+        if caption_images is None:
+            caption_images = [rasterize_caption(segment['text'], int(video_size[0]), segment['height'])
+                              for segment in segments]
+        
+        if word_timings:
+            duration = audio_duration if audio_duration is not None else probe_duration(audio_file)
+            with metrics.span("timing_analysis", method="word_boundaries", words=len(word_timings)):
+                segment_times = align_caption_segments(text, segments, word_timings, duration)
+            if segment_times:
+                caption_cues = []
+                for segment, caption_img, (start, end) in zip(segments, caption_images, segment_times):
+                    if caption_img is not None:
+                        caption_cues.append(CaptionCue(segment['text'], start, end, caption_img))
+                print(f"Timed {len(caption_cues)} captions from {len(word_timings)} word boundaries")
+                return caption_cues
+            print("Word timings did not match the text, estimating caption timing")
+        
+        # Analyze audio for estimated timing
+        with metrics.span("timing_analysis", method="estimate"):
+            timings, duration = analyze_audio_timing(audio_file, text, audio_duration, chunk_anchors)
         
         if not timings:
             print("Could not analyze audio timing, using estimated timing")
             return create_pil_captions(text, duration, video_size)
         
-        caption_clips = []
+        caption_cues = []
         
-        for i, timing in enumerate(timings):
-            try:
-                caption_text = timing['text']
-                
-                # Check if caption is too long and needs splitting
-                caption_parts = split_long_caption(caption_text, max_chars=60)
-                
-                if len(caption_parts) == 1:
-                    # Single caption - use full duration, position at bottom
-                    caption_img = create_caption_image(caption_parts[0], width=int(video_size[0]), height=100)
-                    
-                    if caption_img is not None:
-                        img_clip = ImageClip(caption_img, transparent=True, duration=timing['duration'])
-                        img_clip = img_clip.set_position(('center', 0.5), relative=True)  # Centered in middle
-                        img_clip = img_clip.set_start(timing['start'])
-                        
-                        caption_clips.append(img_clip)
-                        print(f"Caption {i+1}: {timing['start']:.1f}s - {timing['end']:.1f}s")
-                
-                else:
-                    # Split caption - show each part for half the duration
-                    part_duration = timing['duration'] / 2
-                    
-                    for part_idx, part_text in enumerate(caption_parts):
-                        caption_img = create_caption_image(part_text, width=int(video_size[0]), height=80)
-                        
-                        if caption_img is not None:
-                            part_start = timing['start'] + (part_idx * part_duration)
-                            img_clip = ImageClip(caption_img, transparent=True, duration=part_duration)
-                            img_clip = img_clip.set_position(('center', 0.5), relative=True)  # Centered in middle
-                            img_clip = img_clip.set_start(part_start)
-                            
-                            caption_clips.append(img_clip)
-                            print(f"Caption {i+1}.{part_idx+1}: {part_start:.1f}s - {part_start + part_duration:.1f}s (split)")
-                
-            except Exception as e:
-                print(f"Error creating caption clip {i}: {e}")
+        for segment, caption_img in zip(segments, caption_images):
+            if caption_img is None:
                 continue
+            i = segment['sentence']
+            timing = timings[i]
+            
+            if segment['parts'] == 1:
+                # Single caption - use full duration
+                caption_cues.append(CaptionCue(segment['text'], timing['start'], timing['end'], caption_img))
+                logger.debug("Caption %d: %.1fs - %.1fs", i + 1, timing['start'], timing['end'])
+            else:
+                # Split caption - show each part for half the duration
+                part_duration = timing['duration'] / 2
+                part_start = timing['start'] + (segment['part'] * part_duration)
+                caption_cues.append(CaptionCue(segment['text'], part_start, part_start + part_duration, caption_img))
+                logger.debug("Caption %d.%d: %.1fs - %.1fs (split)", i + 1, segment['part'] + 1,
+                             part_start, part_start + part_duration)
         
-        return caption_clips
+        return caption_cues
         
     except Exception as e:
         print(f"Error creating accurate captions: {e}")
         return create_pil_captions(text, 60, video_size)
 
+def rasterize_caption(text, width, height):
+    """create_caption_image, timed as a caption_rasterization span."""
+    with metrics.span("caption_rasterization", chars=len(text)):
+        return create_caption_image(text, width=width, height=height)
+
 def create_pil_captions(text, video_duration, video_size):
     """Create captions using PIL images with estimated timing."""
     try:
@@ -865,7 +1389,7 @@ def create_pil_captions(text, video_duration, video_size):
         
         # Calculate timing for each chunk
         time_per_chunk = video_duration / len(chunks)
-        caption_clips = []
+        caption_cues = []
         
         for i, chunk in enumerate(chunks):
             try:
@@ -879,12 +1403,9 @@ def create_pil_captions(text, video_duration, video_size):
                     if caption_img is not None:
                         # Single caption - use full duration
                         duration = min(time_per_chunk, video_duration - (i * time_per_chunk))
-                        img_clip = ImageClip(caption_img, transparent=True, duration=duration)
-                        img_clip = img_clip.set_position(('center', 0.5), relative=True)  # Centered in middle
-                        img_clip = img_clip.set_start(i * time_per_chunk)
-                        
-                        caption_clips.append(img_clip)
-                        print(f"PIL Caption {i+1}: {i * time_per_chunk:.1f}s - {(i+1) * time_per_chunk:.1f}s")
+                        start = i * time_per_chunk
+                        caption_cues.append(CaptionCue(chunk_parts[0], start, start + duration, caption_img))
+                        logger.debug("PIL Caption %d: %.1fs - %.1fs", i + 1, i * time_per_chunk, (i + 1) * time_per_chunk)
                 
                 else:
                     # Split caption - show each part for half the duration
@@ -896,64 +1417,213 @@ def create_pil_captions(text, video_duration, video_size):
                         if caption_img is not None:
                             part_start = (i * time_per_chunk) + (part_idx * part_duration)
                             duration = min(part_duration, video_duration - part_start)
-                            img_clip = ImageClip(caption_img, transparent=True, duration=duration)
-                            img_clip = img_clip.set_position(('center', 0.5), relative=True)  # Centered in middle
-                            img_clip = img_clip.set_start(part_start)
-                            
-                            caption_clips.append(img_clip)
-                            print(f"PIL Caption {i+1}.{part_idx+1}: {part_start:.1f}s - {part_start + duration:.1f}s (split)")
+                            caption_cues.append(CaptionCue(part_text, part_start, part_start + duration, caption_img))
+                            logger.debug("PIL Caption %d.%d: %.1fs - %.1fs (split)", i + 1, part_idx + 1, part_start, part_start + duration)
                 
             except Exception as e:
                 print(f"Error creating PIL caption clip {i}: {e}")
                 continue
         
-        return caption_clips
+        return caption_cues
     except Exception as e:
         print(f"Error creating PIL captions: {e}")
         return []
 
+# Render backend for create_video: "moviepy" (default) or "ffmpeg" (single ffmpeg filter graph)
+RENDER_BACKEND = os.getenv("RENDER_BACKEND", "moviepy")
+RENDER_BACKENDS = ("moviepy", "ffmpeg")
+LOFI_LOOP_FILE = "static/lofi_loop.wav"  # Seamless ambient tile (the faded lofi_background.wav would pulse when looped)
+MUSIC_CROSSFADE_SECONDS = 2.0  # Loop seam cross-fade for background music
+
+@functools.lru_cache(maxsize=None)
+def get_music_library():
+    """Music library of static/music plus the bundled lofi loop, decoded once per process (see music_library.py)."""
+    from music_library import MusicLibrary
+    
+    loop_file = os.path.join(os.getcwd(), LOFI_LOOP_FILE)
+    if not os.path.exists(loop_file):
+        from create_lofi_background import create_lofi_loop
+        
+        create_lofi_loop(filename=loop_file)
+    library = MusicLibrary(loop_files=(loop_file,))
+    library.scan()
+    return library
+
+def pick_background_music():
+    """Random background track name, or None when there is no music to use."""
+    try:
+        return get_music_library().pick_track()
+    except Exception as e:
+        print(f"Error loading music library: {e}")
+        return None
+
+def profile_output_height(profile, frame_size):
+    """Output height for a profile, or None when the frame is already that small (never upscale)."""
+    if profile.height and profile.height < frame_size[1]:
+        return profile.height
+    return None
+
+_background_readers = {}
+_background_readers_lock = threading.Lock()
+
+def open_background_reader(video_file):
+    """
+    VideoFileClip for a background file, opened once per process and reused by later
+    renders (a long-running process such as generator_daemon.py skips the reader start-up).
+    """
+    from moviepy.editor import VideoFileClip
+    
+    key = (video_file, os.path.getmtime(video_file))
+    with _background_readers_lock:
+        clip = _background_readers.get(key)
+        if clip is None:
+            clip = _background_readers[key] = VideoFileClip(video_file)
+        return clip
+
+class PreparedBackground:
+    """Background footage chosen ahead of rendering: file, 9:16 crop, segment start, optional open clip."""
+    
+    def __init__(self, video_file, duration, crop, start_time):
+        self.video_file = video_file
+        self.duration = duration
+        self.crop = crop
+        self.start_time = start_time
+        self.clip = None
+    
+    @property
+    def frame_size(self):
+        return (self.crop[2] - self.crop[0], self.crop[3] - self.crop[1])
+    
+    def fit(self, audio_duration):
+        """Move the segment start back if the real narration is longer than expected."""
+        if self.start_time + audio_duration > self.duration:
+            self.start_time = max(0, self.duration - audio_duration)
+    
+    def open(self):
+        """Open the video reader and decode the first frame of the segment (warms up the seek)."""
+        if self.clip is None:
+            self.clip = open_background_reader(self.video_file)
+            self.clip.get_frame(self.start_time)
+        return self.clip
+
+def prepare_background_segment(input_video_file, expected_duration):
+    """
+    Choose the background file (the prepared 9:16 mezzanine when there is one, see
+    background_prep.py), its crop and a random segment start for the expected duration.
+    """
+    mezzanine = find_mezzanine(input_video_file)
+    if mezzanine:
+        print(f"🎞️ Using prepared background: {os.path.basename(mezzanine['path'])}")
+        crop = (0, 0, mezzanine["width"], mezzanine["height"])
+        return PreparedBackground(mezzanine["path"], mezzanine["duration"], crop,
+                                  pick_segment_start(mezzanine, expected_duration))
+    
+    video_info = probe_media(input_video_file)
+    video_duration = float(video_info["format"]["duration"])
+    video_stream = next(st for st in video_info["streams"] if st.get("codec_type") == "video")
+    crop = compute_vertical_crop(video_stream["width"], video_stream["height"])
+    start_time = random.uniform(0, max(0, video_duration - expected_duration))
+    return PreparedBackground(input_video_file, video_duration, crop, start_time)
+
+def create_video_ffmpeg(input_video_file, input_audio_file, output_path, story_text="",
+                        caption_images=None, background=None, word_timings=None, chunk_anchors=None,
+                        profile=None):
+    """Render the same layout as create_video with one ffmpeg invocation (no frames through Python)."""
+    profile = get_render_profile(profile)
+    work_dir = tempfile.mkdtemp(prefix="render-")
+    try:
+        audio_duration = probe_duration(input_audio_file)
+        if background is None:
+            background = prepare_background_segment(input_video_file, audio_duration)
+        background.fit(audio_duration)
+        
+        print("Creating accurate captions with audio timing...")
+        caption_cues = create_accurate_captions(story_text, input_audio_file, background.frame_size,
+                                                audio_duration, caption_images, word_timings, chunk_anchors)
+        caption_track = CaptionTrack(caption_cues, background.frame_size) if caption_cues else None
+        if caption_track:
+            print(f"✅ Added {len(caption_track)} caption segments with accurate timing")
+        else:
+            print("⚠️ No captions added - using video without captions")
+        
+        # Looped from the decoded PCM cache, with the same seams as the MoviePy mix
+        music_track = pick_background_music()
+        music_input = (get_music_library().ffmpeg_input(music_track, audio_duration, MUSIC_CROSSFADE_SECONDS, work_dir)
+                       if music_track else None)
+        if music_track:
+            print(f"Added background music: {music_track}")
+        
+        # Same levels as the MoviePy mix (music volumex(0.15) twice, ambient 0.05 * 0.15)
+        return render_with_ffmpeg(
+            background.video_file, input_audio_file, output_path, background.start_time, audio_duration,
+            background.crop,
+            caption_track=caption_track,
+            music_input=music_input,
+            music_volume=0.15 * 0.15, ambient_volume=0.05 * 0.15, narration_volume=0.9,
+            work_dir=work_dir, fps=profile.fps, encoder_args=x264_args(profile),
+            output_height=profile_output_height(profile, background.frame_size)
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
 # Helper function to create a TikTok-compatible video with captions and background music
-def create_video(input_video_file, input_audio_file, output_file, story_text=""):
-    """Creates a TikTok-style video with captions, background music, and 9:16 aspect ratio."""
+def create_video(input_video_file, input_audio_file, output_file, story_text="", backend=None, work_dir=None,
+                 caption_images=None, background=None, word_timings=None, chunk_anchors=None, profile=None,
+                 frame_profile_dir=None):
+    """
+    Creates a TikTok-style video with captions, background music, and 9:16 aspect ratio.
+    caption_images / background let a caller prepare captions and footage while TTS is running;
+    word_timings and chunk_anchors (from generate_narration) time the captions; profile picks the
+    encoder settings (name or RenderProfile, see render_profiles.py). With frame_profile_dir
+    (or FRAME_PROFILE_DIR) the MoviePy render is profiled per layer (see render_profiler.py).
+    """
     try:
         output_path = os.path.join(os.getcwd(), output_file)
+        
+        if (backend or RENDER_BACKEND).lower() == "ffmpeg":
+            print("🎞️ Rendering with the ffmpeg backend...")
+            return create_video_ffmpeg(input_video_file, input_audio_file, output_path, story_text,
+                                       caption_images, background, word_timings, chunk_anchors, profile)
+        
+        profile = get_render_profile(profile)
+        from moviepy.editor import AudioFileClip, CompositeAudioClip
 
-        # Load video and narration audio
-        video = VideoFileClip(input_video_file)
+        # Load narration audio, then video (the prepared mezzanine when there is one)
         narration_audio = AudioFileClip(input_audio_file)
-
-        # Calculate audio duration and select a video slice
         audio_duration = narration_audio.duration
-        max_start_time = max(0, video.duration - audio_duration)
-        start_time = random.uniform(0, max_start_time)
+        if background is None:
+            background = prepare_background_segment(input_video_file, audio_duration)
+        background.fit(audio_duration)
+        video = background.open()
+
+        # Select a video slice
+        start_time = background.start_time
         end_time = start_time + audio_duration
         video_slice = video.subclip(start_time, end_time)
+        
+        # Opt-in frame profiler: every layer below is wrapped so its per-frame cost is measured
+        frame_profile_dir = frame_profile_dir or FRAME_PROFILE_DIR
+        profiler = FrameProfiler() if frame_profile_dir else None
+        if profiler:
+            video_slice = profiler.wrap(video_slice, "decode")
 
-        # Crop video to fit TikTok's 9:16 aspect ratio
-        target_aspect_ratio = 9 / 16
-        video_width, video_height = video_slice.size
-        current_aspect_ratio = video_width / video_height
-
-        if current_aspect_ratio > target_aspect_ratio:
-            # Crop width (landscape video)
-            new_width = int(video_height * target_aspect_ratio)
-            crop_x1 = (video_width - new_width) // 2
-            crop_x2 = crop_x1 + new_width
-            video_cropped = video_slice.crop(x1=crop_x1, x2=crop_x2)
+        # Crop video to fit TikTok's 9:16 aspect ratio (the mezzanine already is)
+        crop_x1, crop_y1, crop_x2, crop_y2 = background.crop
+        if background.frame_size == tuple(video_slice.size):
+            video_cropped = video_slice
         else:
-            # Crop height (portrait video)
-            new_height = int(video_width / target_aspect_ratio)
-            crop_y1 = (video_height - new_height) // 2
-            crop_y2 = crop_y1 + new_height
-            video_cropped = video_slice.crop(y1=crop_y1, y2=crop_y2)
+            video_cropped = video_slice.crop(x1=crop_x1, y1=crop_y1, x2=crop_x2, y2=crop_y2)
+            if profiler:
+                video_cropped = profiler.wrap(video_cropped, "crop")
 
-        # Create background music (soft lofi)
+        # Create background music (a library track looped to the narration length)
         try:
-            lofi_path = os.path.join(os.getcwd(), "static/lofi_background.wav")
-            if os.path.exists(lofi_path):
-                background_music = AudioFileClip(lofi_path).subclip(0, audio_duration)
+            music_track = pick_background_music()
+            if music_track:
+                background_music = get_music_library().audio_clip(music_track, audio_duration,
+                                                                  crossfade=MUSIC_CROSSFADE_SECONDS)
                 background_music = background_music.volumex(0.15)  # Soft background volume
-                print("Added lofi background music")
+                print(f"Added background music: {music_track}")
             else:
                 # Fallback to video's original audio as ambient sound
                 background_music = video_cropped.audio
@@ -981,11 +1651,17 @@ def create_video(input_video_file, input_audio_file, output_file, story_text="")
         # Create accurate captions based on audio analysis
         print("Creating accurate captions with audio timing...")
         try:
-            caption_clips = create_accurate_captions(story_text, input_audio_file, video_cropped.size)
+            caption_cues = create_accurate_captions(story_text, input_audio_file, video_cropped.size,
+                                                    audio_duration, caption_images, word_timings, chunk_anchors)
             
-            if caption_clips:
-                final_video = CompositeVideoClip([video_with_audio] + caption_clips)
-                print(f"✅ Added {len(caption_clips)} caption segments with accurate timing")
+            if caption_cues:
+                # One time-indexed caption layer instead of one composited clip per caption
+                with metrics.span("compositing", backend="moviepy", captions=len(caption_cues)):
+                    caption_track = CaptionTrack(caption_cues, video_cropped.size)
+                    final_video = caption_track.apply(video_with_audio)
+                    if profiler:
+                        final_video = profiler.wrap(final_video, "captions")
+                print(f"✅ Added {len(caption_track)} caption segments with accurate timing")
             else:
                 final_video = video_with_audio
                 print("⚠️ No captions added - using video without captions")
@@ -993,15 +1669,35 @@ def create_video(input_video_file, input_audio_file, output_file, story_text="")
             print(f"❌ Caption creation failed: {e}")
             final_video = video_with_audio
 
-        # Write the final video
-        final_video.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            temp_audiofile="temp-audio.m4a",
-            remove_temp=True,
-            fps=24
-        )
+        # Downscale after the captions are burned in (draft profile)
+        output_height = profile_output_height(profile, final_video.size)
+        if output_height:
+            final_video = final_video.resize(height=output_height)
+            if profiler:
+                final_video = profiler.wrap(final_video, "resize")
+        if profiler:
+            final_video = profiler.wrap(final_video, "composite")
+
+        # Write the final video (frames are composited as they are encoded)
+        with metrics.span("encode", backend="moviepy", profile=profile.name, seconds=audio_duration) as attrs, \
+                (profiler.encoding() if profiler else contextlib.nullcontext()):
+            final_video.write_videofile(
+                output_path,
+                codec="libx264",
+                audio_codec="aac",
+                temp_audiofile=os.path.join(work_dir or os.getcwd(), "temp-audio.m4a"),
+                remove_temp=True,
+                fps=profile.fps,
+                preset=profile.preset,
+                threads=profile.threads or None,
+                ffmpeg_params=["-crf", str(profile.crf)]
+            )
+            attrs["bytes"] = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        
+        if profiler:
+            profile_name = os.path.splitext(os.path.basename(output_path))[0]
+            print(f"🔬 Frame profile ({frame_profile_dir}/{profile_name}.folded):")
+            print(profiler.write(frame_profile_dir, profile_name))
 
         # Ensure the file exists before returning
         return output_path if os.path.exists(output_path) else None
@@ -1037,7 +1733,368 @@ def create_safe_filename(title, max_length=50):
     
     return safe_title or "untitled_story"
 
-if __name__ == "__main__":
+# Popular TikTok voices you can choose from (Disney voices disabled):
+TIKTOK_VOICES = {
+    "en_us_001": "Female (Standard)",
+    "en_us_002": "Female (Warm)",
+    "en_us_006": "Male (Standard)", 
+    "en_us_007": "Male (Narrator)",
+    "en_us_009": "Male (Funny)",
+    "en_us_010": "Male (Serious)",
+    "en_male_narration": "Male (Storyteller)",
+    "en_male_funny": "Male (Comedic)",
+    "en_female_emotional": "Female (Emotional)",
+    "en_male_cody": "Male (Cody)",
+    "en_us_chewbacca": "Chewbacca (Star Wars)",
+    "en_us_ghostface": "Ghostface (Scream)",
+    "en_us_c3po": "C-3PO (Star Wars)"
+}
+
+# Select a popular voice with weighted randomness (Disney voices disabled)
+VOICE_WEIGHTS = {
+    "en_male_narration": 35, # Great storyteller voice (boosted)
+    "en_us_007": 25,         # Professional narrator (boosted)
+    "en_us_009": 20,         # Funny voice (boosted)
+    "en_us_006": 15,         # Male standard voice
+    "en_us_ghostface": 5     # Dramatic but niche
+}
+
+def select_narration_voice(story_id=None):
+    """
+    Pick a weighted-random TikTok voice, not the one used for the previous story. With a
+    story_id the pick is seeded by it, so a retry or re-render of the story gets the same
+    voice (and its cached narration).
+    """
+    last_voice = load_last_voice()
+    if story_id is not None and story_id == load_last_voice_story() and last_voice in VOICE_WEIGHTS:
+        return last_voice  # Same story again
+    
+    # Weighted random order of all voices (key u ** (1 / weight)), seeded per story
+    rng = random.Random(story_id) if story_id is not None else random
+    ranked_voices = sorted(VOICE_WEIGHTS, key=lambda voice: rng.random() ** (1 / VOICE_WEIGHTS[voice]),
+                           reverse=True)
+    
+    # Skip the last voice to ensure variety
+    selected_voice = ranked_voices[0]
+    if selected_voice == last_voice:
+        print(f"🚫 Excluding last used voice: {TIKTOK_VOICES.get(last_voice, last_voice)}")
+        selected_voice = ranked_voices[1]
+    
+    # Save this voice as the last used
+    save_last_voice(selected_voice, story_id)
+    return selected_voice
+
+def narrate_story(narration_text, output_file, story_id=None):
+    """
+    Narrate with a weighted TikTok voice (stable per story_id), falling back to Edge-TTS.
+    Returns (audio path or None, timing dict from generate_narration).
+    """
+    selected_voice = select_narration_voice(story_id)
+    
+    print(f"Trying TikTok voice: {TIKTOK_VOICES.get(selected_voice, selected_voice)}")
+    narration_path, timing = generate_narration(narration_text, output_file, selected_voice, use_tiktok=True,
+                                                with_timing=True)
+    
+    # If TikTok TTS fails, fall back to Edge-TTS
+    if not narration_path or not os.path.exists(narration_path):
+        print("TikTok TTS failed, falling back to Edge-TTS...")
+        edge_voice = "en-US-AndrewNeural"  # Professional male voice
+        narration_path, timing = generate_narration(narration_text, output_file, edge_voice, use_tiktok=False,
+                                                    with_timing=True)
+    return narration_path, timing
+
+def generate_video_for_story(approved_story, path_name, work_dir=None, backend=None, profile=None):
+    """Narrate and render an approved story. Scratch files go to work_dir (default: CWD)."""
+    work_dir = work_dir or os.getcwd()
+    
+    # Final duration check
+    is_valid, estimated_duration = validate_story_length(approved_story)
+    if estimated_duration > 170:
+        print(f"❌ HARD LIMIT VIOLATION: Story exceeds 2:50 ({estimated_duration:.1f}s)")
+    else:
+        print(f"✅ Story duration: {estimated_duration:.1f} seconds (within HARD LIMIT)")
+    print()
+    # Combine the title and body for narration
+    narration_text = f"{approved_story['title']} {approved_story['body']}"
+
+    # File paths
+    input_video = os.path.join(os.getcwd(), "static/minecraft_background.mp4")  # Path to test video
+    input_audio = os.path.join(work_dir, "narration.mp3")  # Path to generated narration audio
+    
+    # Create filename based on story title
+    safe_filename = create_safe_filename(approved_story['title'])
+    
+    # Create separate folders for each story type
+    folder_name = path_name.lower().replace(" ", "_")  # Convert "Personal Stories" to "personal_stories"
+    story_type_dir = os.path.join(os.path.dirname(os.getcwd()), "rendered_videos", folder_name)
+    
+    # Create the story type directory if it doesn't exist
+    os.makedirs(story_type_dir, exist_ok=True)
+    
+    output_video = os.path.join(story_type_dir, f"{safe_filename}.mp4")
+    print(f"📁 Output filename: {safe_filename}.mp4 (saved to thread-2-tok/rendered_videos/{folder_name}/)")
+
+    if not os.path.exists(input_video):
+        print(f"Error: Input video not found: {input_video}")
+        return None
+
+    # Captions and background only depend on the text, so they are prepared while TTS runs
+    try:
+        background = prepare_background_segment(input_video, estimated_duration)
+    except Exception as e:
+        print(f"Error reading background video: {e}")
+        return None
+    caption_segments = layout_caption_segments(narration_text)
+    render_backend = (backend or RENDER_BACKEND).lower()
+    
+    with ThreadPoolExecutor(max_workers=CAPTION_RENDER_WORKERS) as caption_pool, \
+            ThreadPoolExecutor(max_workers=1) as background_pool:
+        caption_images = [
+            caption_pool.submit(metrics.bind(rasterize_caption), segment['text'], background.frame_size[0],
+                                segment['height'])
+            for segment in caption_segments
+        ]
+        background_ready = None
+        if render_backend != "ffmpeg":
+            background_ready = background_pool.submit(background.open)
+        
+        narration_path, narration_timing = narrate_story(narration_text, input_audio, approved_story.get('id'))
+
+        print("Checking files:")
+        print(f"  Narration path: {narration_path}")
+        print(f"  Narration exists: {narration_path and os.path.exists(narration_path)}")
+        print(f"  Input video: {input_video}")
+        
+        if not (narration_path and os.path.exists(narration_path)):
+            print("Error: Narration file not found.")
+            for future in caption_images:
+                future.cancel()
+            return None
+        
+        if background_ready is not None:
+            try:
+                background_ready.result()
+            except Exception as e:
+                print(f"Error opening background video: {e}")
+                return None
+        
+        # Encoding starts now; captions still rasterizing are waited for when their cue comes up
+        print("Creating video with captions and background music...")
+        video_path = create_video(input_video, input_audio, output_video, narration_text,
+                                  backend=backend, work_dir=work_dir, profile=profile,
+                                  caption_images=caption_images, background=background,
+                                  word_timings=narration_timing.get('words'),
+                                  chunk_anchors=narration_timing.get('anchors'))
+        if video_path:
+            print(f"Video successfully created: {video_path}")
+        else:
+            print("Error: Video generation failed.")
+        return video_path
+
+def approve_story(story, min_score=0, max_duration=170):
+    """Auto-approval policy for unattended runs: score threshold plus the hard duration limit."""
+    is_valid, estimated_duration = validate_story_length(story)
+    if not is_valid or estimated_duration > max_duration:
+        return False, f"too long ({estimated_duration:.0f}s)"
+    if story["score"] < min_score:
+        return False, f"score {story['score']} < {min_score}"
+    return True, "approved"
+
+def render_story_job(story, path_name, backend=None, profile=None):
+    """
+    Process-pool worker: narrate and render one story inside a private scratch directory.
+    Returns (story id, video path or None, seconds, trace dict of the render's spans).
+    """
+    work_dir = tempfile.mkdtemp(prefix=f"job-{story['id']}-")
+    started = time.time()
+    trace = None
+    try:
+        # The caller owns the trace file, spans come back with the result
+        with metrics.job_trace(f"{story['id']}-{int(started)}", trace_dir=None,
+                               story_id=story["id"], path=path_name) as trace:
+            video_path = generate_video_for_story(story, path_name, work_dir=work_dir, backend=backend,
+                                                  profile=profile)
+        return story["id"], video_path, time.time() - started, trace.to_dict()
+    except Exception as e:
+        print(f"Error rendering story {story['id']}: {e}")
+        return story["id"], None, time.time() - started, trace.to_dict() if trace else None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+# Job API: generation runs on JobManager threads, rendering in a separate process pool
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "20"))
+_job_manager = None
+_render_pool = None
+_job_lock = threading.Lock()
+
+def get_render_pool():
+    """Process pool that does the TTS + encode work for API jobs."""
+    global _render_pool
+    with _job_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=JOB_WORKERS)
+        return _render_pool
+
+def run_generation_job(job):
+    """JobManager runner: pick a story for the requested path, then render it in the process pool."""
+    # One trace per job (selection here, render spans from the worker process) in traces/<job id>.json
+    with metrics.job_trace(job.id, path=job.params["path"]) as trace:
+        return _select_and_render(job, trace)
+
+def _select_and_render(job, trace):
+    params = job.params
+    subreddits, path_name = SUBREDDIT_PATHS[params["path"]]
+    min_score = params.get("min_score", 0)
+    
+    job.emit("fetching", 10, f"Looking for a story in {path_name}")
+    story = None
+    for _ in range(5):
+        job.check_cancelled()
+        candidate = fetch_story_from_multiple_subreddits(subreddits)
+        if not candidate:
+            break
+        approved, reason = approve_story(candidate, min_score)
+        if approved:
+            story = candidate
+            break
+        job.emit("fetching", 10, f"Skipped '{candidate['title'][:50]}': {reason}")
+    if story is None:
+        job.error = "No story passed the approval policy"
+        return None
+    
+    job.check_cancelled()
+    job.emit("rendering", 30, f"Rendering '{story['title'][:50]}' (score {story['score']})")
+    future = get_render_pool().submit(render_story_job, story, path_name, params.get("backend"),
+                                      params.get("profile"))
+    while True:
+        try:
+            _, video_path, elapsed, render_trace = future.result(timeout=0.5)
+            trace.merge(render_trace)
+            break
+        except FuturesTimeout:
+            if job.cancel_requested.is_set():
+                # A running render can't be interrupted, discard its output when it lands
+                future.add_done_callback(_discard_cancelled_render)
+                raise JobCancelled()
+    
+    job.emit("rendered", 95, f"Rendered in {elapsed:.0f}s")
+    return video_path
+
+def _discard_cancelled_render(future):
+    try:
+        _, video_path, _, _ = future.result()
+        if video_path and os.path.exists(video_path):
+            os.remove(video_path)
+    except Exception as e:
+        print(f"Error discarding cancelled render: {e}")
+
+def get_job_manager():
+    """Create the job manager on first use so importing app.py doesn't start threads."""
+    global _job_manager
+    with _job_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(run_generation_job, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE)
+        return _job_manager
+
+@app.route("/metrics")
+def get_metrics():
+    """Stage counters and duration histograms (Prometheus text format, or JSON with ?format=json)."""
+    if request.args.get("format") == "json":
+        return jsonify(metrics.registry.snapshot())
+    return Response(metrics.registry.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/jobs", methods=["POST"])
+def submit_job():
+    """Submit a generation job: {"path": "aita", "min_score": 500, "backend": "ffmpeg", "profile": "draft"}."""
+    data = request.get_json(silent=True) or {}
+    if data.get("path") not in SUBREDDIT_PATHS:
+        return jsonify({"error": f"path must be one of {sorted(SUBREDDIT_PATHS)}"}), 400
+    if data.get("backend") is not None and data["backend"] not in RENDER_BACKENDS:
+        return jsonify({"error": f"backend must be one of {sorted(RENDER_BACKENDS)}"}), 400
+    if data.get("profile") is not None and data["profile"] not in RENDER_PROFILES:
+        return jsonify({"error": f"profile must be one of {sorted(RENDER_PROFILES)}"}), 400
+    try:
+        params = {
+            "path": data["path"],
+            "min_score": int(data.get("min_score", 0)),
+            "backend": data.get("backend"),
+            "profile": data.get("profile"),
+        }
+        job = get_job_manager().submit(params)
+    except ValueError:
+        return jsonify({"error": "min_score must be an integer"}), 400
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "60"}
+    return jsonify(job.to_dict()), 202, {"Location": f"/api/jobs/{job.id}"}
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    return jsonify([job.to_dict() for job in get_job_manager().list()])
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/api/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not manager.cancel(job_id):
+        return jsonify({"error": f"Job already {job.status}"}), 409
+    return jsonify(job.to_dict()), 202
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """Server-sent events feed of a job's progress (use ?since=N to resume)."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    since = request.args.get("since", 0, type=int)
+    
+    def stream():
+        index = max(0, since)
+        while True:
+            events = job.wait_for_events(index)
+            for event in events:
+                yield f"id: {event['index']}\ndata: {json.dumps(event)}\n\n"
+            index += len(events)
+            # Finished with nothing left to send (also when resuming past the last event)
+            if job.status in FINISHED_STATUSES and index >= len(job.events):
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+    
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.route("/api/jobs/<job_id>/download", methods=["GET"])
+def download_job(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status != STATUS_DONE or not job.result or not os.path.exists(job.result):
+        return jsonify({"error": f"Job is {job.status}, no video to download"}), 409
+    return send_file(job.result, mimetype="video/mp4", as_attachment=True,
+                     download_name=os.path.basename(job.result))
+
+def generate_approved_video(story, path_name, backend=None, profile=None):
+    """Render an approved story in this process, recording the job trace."""
+    with metrics.job_trace(story["id"], path=path_name):
+        return generate_video_for_story(story, path_name, backend=backend, profile=profile)
+
+def main(fetch_story=None, generate_video=None):
+    """
+    Interactive generator: pick a content path, approve a story, render it. Returns the
+    video path or None. fetch_story(subreddits) and generate_video(story, path_name) default
+    to in-process generation; launcher.py passes ones that go through generator_daemon.py.
+    """
+    fetch_story = fetch_story or fetch_story_from_multiple_subreddits
+    generate_video = generate_video or generate_approved_video
     print("🎬 Reddit-to-TikTok Generator Starting...")
     
     # Get user's subreddit choice once at startup
@@ -1052,124 +2109,31 @@ if __name__ == "__main__":
         print(f"\n🔍 Fetching a new story from {path_name} subreddits...")
         
         # Fetch a story from the user's selected subreddits
-        story = fetch_story_from_multiple_subreddits(selected_subreddits)
+        story = fetch_story(selected_subreddits)
         
         if story:
             # Ask user for approval
             if ask_user_approval(story):
                 approved_story = story
-                print(f"\n✅ Story approved! Proceeding with video generation...")
+                print("\n✅ Story approved! Proceeding with video generation...")
             else:
-                print(f"\n❌ Story rejected and blacklisted. Fetching another story...")
+                print("\n❌ Story rejected and blacklisted. Fetching another story...")
                 continue
         else:
             print("❌ No suitable stories found. Exiting...")
             break
     
     if approved_story:
-        print(f"\n🎯 GENERATING VIDEO FOR APPROVED STORY:")
+        print("\n🎯 GENERATING VIDEO FOR APPROVED STORY:")
         print(f"Title: {approved_story['title']}")
         print(f"Score: {approved_story['score']} | Comments: {approved_story['comments']}")
         print(f"URL: {approved_story['url']}")
         print(f"Text length: {len(approved_story['body'])} characters")
         
-        # Final duration check
-        is_valid, estimated_duration = validate_story_length(approved_story)
-        if estimated_duration > 170:
-            print(f"❌ HARD LIMIT VIOLATION: Story exceeds 2:50 ({estimated_duration:.1f}s)")
-        else:
-            print(f"✅ Story duration: {estimated_duration:.1f} seconds (within HARD LIMIT)")
-        print()
-        # Combine the title and body for narration
-        narration_text = f"{approved_story['title']} {approved_story['body']}"
-
-        # File paths
-        input_video = os.path.join(os.getcwd(), "static/minecraft_background.mp4")  # Path to test video
-        input_audio = os.path.join(os.getcwd(), "narration.mp3")  # Path to generated narration audio
-        
-        # Create filename based on story title
-        safe_filename = create_safe_filename(approved_story['title'])
-        
-        # Create separate folders for each story type
-        folder_name = path_name.lower().replace(" ", "_")  # Convert "Personal Stories" to "personal_stories"
-        story_type_dir = os.path.join(os.path.dirname(os.getcwd()), "rendered_videos", folder_name)
-        
-        # Create the story type directory if it doesn't exist
-        os.makedirs(story_type_dir, exist_ok=True)
-        
-        output_video = os.path.join(story_type_dir, f"{safe_filename}.mp4")
-        print(f"📁 Output filename: {safe_filename}.mp4 (saved to thread-2-tok/rendered_videos/{folder_name}/)")
-
-        # Generate narration audio from the fetched story
-        # Popular TikTok voices you can choose from (Disney voices disabled):
-        tiktok_voices = {
-            "en_us_001": "Female (Standard)",
-            "en_us_002": "Female (Warm)",
-            "en_us_006": "Male (Standard)", 
-            "en_us_007": "Male (Narrator)",
-            "en_us_009": "Male (Funny)",
-            "en_us_010": "Male (Serious)",
-            "en_male_narration": "Male (Storyteller)",
-            "en_male_funny": "Male (Comedic)",
-            "en_female_emotional": "Female (Emotional)",
-            "en_male_cody": "Male (Cody)",
-            "en_us_chewbacca": "Chewbacca (Star Wars)",
-            "en_us_ghostface": "Ghostface (Scream)",
-            "en_us_c3po": "C-3PO (Star Wars)"
-        }
-        
-        # Select a popular voice with weighted randomness (Disney voices disabled)
-        voice_weights = {
-            "en_male_narration": 35, # Great storyteller voice (boosted)
-            "en_us_007": 25,         # Professional narrator (boosted)
-            "en_us_009": 20,         # Funny voice (boosted)
-            "en_us_006": 15,         # Male standard voice
-            "en_us_ghostface": 5     # Dramatic but niche
-        }
-        
-        # Get last used voice to avoid repetition
-        last_voice = load_last_voice()
-        
-        # Remove last voice from selection to ensure variety
-        available_voices = voice_weights.copy()
-        if last_voice and last_voice in available_voices:
-            del available_voices[last_voice]
-            print(f"🚫 Excluding last used voice: {tiktok_voices.get(last_voice, last_voice)}")
-        
-        # Weighted random selection from remaining voices
-        voices = list(available_voices.keys())
-        weights = list(available_voices.values())
-        selected_voice = random.choices(voices, weights=weights)[0]
-        
-        # Save this voice as the last used
-        save_last_voice(selected_voice)
-        
-        print(f"Trying TikTok voice: {tiktok_voices.get(selected_voice, selected_voice)}")
-        narration_path = generate_narration(narration_text, input_audio, selected_voice, use_tiktok=True)
-        
-        # If TikTok TTS fails, fall back to Edge-TTS
-        if not narration_path or not os.path.exists(narration_path):
-            print("TikTok TTS failed, falling back to Edge-TTS...")
-            edge_voice = "en-US-AndrewNeural"  # Professional male voice
-            narration_path = generate_narration(narration_text, input_audio, edge_voice, use_tiktok=False)
-
-        # Create the video with the narration audio
-        print(f"Checking files:")
-        print(f"  Narration path: {narration_path}")
-        print(f"  Narration exists: {narration_path and os.path.exists(narration_path)}")
-        print(f"  Input video: {input_video}")
-        print(f"  Input video exists: {os.path.exists(input_video)}")
-        print(f"  Input audio: {input_audio}")
-        print(f"  Input audio exists: {os.path.exists(input_audio)}")
-        
-        if narration_path and os.path.exists(narration_path) and os.path.exists(input_video):
-            print("Creating video with captions and background music...")
-            video_path = create_video(input_video, input_audio, output_video, narration_text)
-            if video_path:
-                print(f"Video successfully created: {video_path}")
-            else:
-                print("Error: Video generation failed.")
-        else:
-            print("Error: Input video or narration file not found.")
+        return generate_video(approved_story, path_name)
     else:
-        print(f"No stories found in the subreddit '{subreddit_name}'.")
\ No newline at end of file
+        print(f"No stories found in the {path_name} subreddits.")
+        return None
+
+if __name__ == "__main__":
+    main()
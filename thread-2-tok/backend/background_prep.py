@@ -0,0 +1,124 @@
+"""
+Background Preparation
+One-time transcode of background footage into a cropped 9:16, target-resolution
+mezzanine with short fixed GOPs, plus a keyframe table so renders can start on a
+keyframe and skip the full-resolution decode + crop on every job.
+
+Usage: python background_prep.py [static/minecraft_background.mp4 ...]
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+
+from ffmpeg_render import compute_vertical_crop, probe_media
+
+MEZZANINE_DIR_NAME = "mezzanine"  # Created next to the source video
+MEZZANINE_HEIGHT = 1920   # Never upscaled, smaller sources keep their own height
+MEZZANINE_GOP_SECONDS = 1.0
+MEZZANINE_FPS = 24
+
+
+def mezzanine_paths(source_file):
+    """Return (video_path, metadata_path) of the mezzanine for a source video."""
+    name = os.path.splitext(os.path.basename(source_file))[0]
+    base = os.path.join(os.path.dirname(os.path.abspath(source_file)), MEZZANINE_DIR_NAME, name)
+    return f"{base}_9x16.mp4", f"{base}_9x16.json"
+
+
+def read_keyframes(video_file):
+    """Return the sorted keyframe timestamps of a video (packet flags only, no decode)."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_file],
+        capture_output=True, text=True, check=True
+    )
+    keyframes = []
+    for line in result.stdout.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) >= 2 and "K" in parts[1] and parts[0] not in ("", "N/A"):
+            keyframes.append(float(parts[0]))
+    return sorted(keyframes)
+
+
+def prepare_background(source_file, height=MEZZANINE_HEIGHT, gop_seconds=MEZZANINE_GOP_SECONDS, fps=MEZZANINE_FPS):
+    """Transcode a background video into its 9:16 mezzanine and write the keyframe table."""
+    try:
+        video_path, metadata_path = mezzanine_paths(source_file)
+        os.makedirs(os.path.dirname(video_path), exist_ok=True)
+
+        info = probe_media(source_file)
+        stream = next(st for st in info["streams"] if st.get("codec_type") == "video")
+        x1, y1, x2, y2 = compute_vertical_crop(stream["width"], stream["height"])
+
+        # Even dimensions for yuv420p, never upscale
+        target_height = min(height, y2 - y1) // 2 * 2
+        target_width = int(round(target_height * 9 / 16 / 2)) * 2
+        gop = max(1, int(round(gop_seconds * fps)))
+
+        print(f"🎞️ Preparing {source_file} -> {video_path} ({target_width}x{target_height}, GOP {gop} frames)")
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error", "-i", source_file,
+            "-vf", f"crop={x2 - x1}:{y2 - y1}:{x1}:{y1},scale={target_width}:{target_height},fps={fps}",
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "18", "-pix_fmt", "yuv420p",
+            "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+            "-c:a", "aac", "-b:a", "128k",
+            "-movflags", "+faststart",
+            video_path
+        ], check=True)
+
+        source_stat = os.stat(source_file)
+        metadata = {
+            "source": os.path.abspath(source_file),
+            "source_size": source_stat.st_size,
+            "source_mtime": source_stat.st_mtime,
+            "path": video_path,
+            "width": target_width,
+            "height": target_height,
+            "fps": fps,
+            "gop_frames": gop,
+            "duration": float(probe_media(video_path)["format"]["duration"]),
+            "keyframes": read_keyframes(video_path),
+        }
+        with open(metadata_path, "w") as f:
+            json.dump(metadata, f)
+
+        print(f"✅ Mezzanine ready: {len(metadata['keyframes'])} keyframes over {metadata['duration']:.0f}s")
+        return metadata
+    except Exception as e:
+        print(f"Error preparing background {source_file}: {e}")
+        return None
+
+
+def find_mezzanine(source_file):
+    """Return the mezzanine metadata for a source video, or None if missing or out of date."""
+    video_path, metadata_path = mezzanine_paths(source_file)
+    if not (os.path.exists(video_path) and os.path.exists(metadata_path)):
+        return None
+    try:
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+        source_stat = os.stat(source_file)
+        if metadata.get("source_size") != source_stat.st_size or metadata.get("source_mtime") != source_stat.st_mtime:
+            print(f"⚠️ Mezzanine for {source_file} is out of date, run background_prep.py again")
+            return None
+        metadata["path"] = video_path
+        return metadata
+    except Exception as e:
+        print(f"Error reading mezzanine metadata: {e}")
+        return None
+
+
+def pick_segment_start(metadata, segment_duration):
+    """Pick a random keyframe that leaves room for a segment of the given length."""
+    latest_start = metadata["duration"] - segment_duration
+    candidates = [t for t in metadata.get("keyframes", []) if t <= latest_start]
+    return random.choice(candidates) if candidates else 0.0
+
+
+if __name__ == "__main__":
+    sources = sys.argv[1:] or ["static/minecraft_background.mp4"]
+    for source in sources:
+        prepare_background(source)
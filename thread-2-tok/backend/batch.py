@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Headless Batch Generator
+Non-interactive entry point: picks N distinct stories for a content path using an
+auto-approval policy, then narrates and renders them on a bounded process pool.
+Every job gets its own scratch directory, so parallel jobs never share
+narration.mp3 / temp-audio.m4a.
+
+Usage: python batch.py --path aita --count 20 --min-score 500 --workers 2
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import app
+import metrics
+
+
+def pick_stories(subreddits, count, min_score=0, max_duration=170, max_attempts=None):
+    """Pick up to `count` distinct stories that pass the approval policy."""
+    max_attempts = max_attempts or count * 5
+    stories = []
+    seen_ids = set()
+
+    for _ in range(max_attempts):
+        if len(stories) >= count:
+            break
+        story = app.fetch_story_from_multiple_subreddits(subreddits)
+        if not story:
+            print("❌ No more suitable stories available")
+            break
+        if story["id"] in seen_ids:
+            continue
+        seen_ids.add(story["id"])
+
+        approved, reason = app.approve_story(story, min_score, max_duration)
+        if approved:
+            stories.append(story)
+            print(f"✅ [{len(stories)}/{count}] Auto-approved: '{story['title'][:50]}...' (score {story['score']})")
+        else:
+            print(f"⏭️ Skipped '{story['title'][:50]}...': {reason}")
+
+    return stories
+
+
+def run_batch(path_key, count, min_score=0, max_duration=170, workers=2, backend=None, profile=None):
+    """Pick stories and render them in parallel. Returns the list of created video paths."""
+    subreddits, path_name = app.SUBREDDIT_PATHS[path_key]
+    print(f"🎬 Batch: {count} videos from {path_name} ({', '.join(f'r/{sub}' for sub in subreddits)})")
+
+    stories = pick_stories(subreddits, count, min_score, max_duration)
+    if not stories:
+        return []
+
+    print(f"\n🏭 Rendering {len(stories)} videos with {workers} worker processes...")
+    created = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(app.render_story_job, story, path_name, backend, profile) for story in stories]
+        for future in as_completed(futures):
+            story_id, video_path, elapsed, render_trace = future.result()
+            if render_trace:
+                metrics.write_trace(render_trace)
+            if video_path:
+                created.append(video_path)
+                print(f"✅ {story_id}: {video_path} ({elapsed:.0f}s)")
+            else:
+                print(f"❌ {story_id}: render failed ({elapsed:.0f}s)")
+
+    print(f"\n🎉 Batch complete: {len(created)}/{len(stories)} videos created")
+    return created
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate several videos without prompts.")
+    parser.add_argument("--path", choices=sorted(app.SUBREDDIT_PATHS), required=True,
+                        help="content path to pull stories from")
+    parser.add_argument("--count", type=int, default=1, help="number of videos to create")
+    parser.add_argument("--min-score", type=int, default=0, help="auto-approve stories with at least this score")
+    parser.add_argument("--max-duration", type=float, default=170, help="auto-approve stories up to this length (s)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="parallel render processes")
+    parser.add_argument("--backend", choices=["moviepy", "ffmpeg"], default=None, help="render backend")
+    parser.add_argument("--profile", choices=sorted(app.RENDER_PROFILES), default=None,
+                        help="render profile (default: RENDER_PROFILE or standard)")
+    args = parser.parse_args(argv)
+
+    # Paths in app.py are relative to the backend directory
+    os.chdir(Path(__file__).parent)
+    created = run_batch(args.path, args.count, args.min_score, args.max_duration, args.workers, args.backend,
+                        args.profile)
+    return 0 if created else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
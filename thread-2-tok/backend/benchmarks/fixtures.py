@@ -0,0 +1,97 @@
+"""
+Benchmark Fixtures
+Synthetic inputs for the benchmark suite: canned stories, fake Reddit listing
+posts, a generated background video and a fake TTS that writes silence.
+Nothing here touches the network.
+"""
+
+import os
+import random
+import subprocess
+import wave
+from types import SimpleNamespace
+
+SENTENCES = [
+    "So this happened last weekend and I still can't believe it.",
+    "My sister asked me to host her birthday party at my apartment!",
+    "I said yes, but only if she helped clean up afterwards.",
+    "She agreed, and then left at midnight without saying a word.",
+    "The kitchen was covered in frosting, glitter and something sticky?",
+    "I sent her a bill for the cleaning service the next morning.",
+    "Now half the family thinks I'm petty and the other half is on my side.",
+    "For context, this is the third time she has done something like this.",
+    "My mom called me and said family doesn't charge family.",
+    "I honestly don't know anymore, so here I am asking strangers.",
+]
+UPDATE_PREFIXES = ["UPDATE: ", "EDIT: ", "FINAL UPDATE ", "PART 2 "]
+
+BACKGROUND_SIZE = (1920, 1080)  # Landscape, like the real gameplay footage, so the 9:16 crop is exercised
+BACKGROUND_SECONDS = 30
+BACKGROUND_FPS = 24
+
+
+def make_story(sentence_count, seed=0):
+    """A story dict (title + body) built from the canned sentences."""
+    rng = random.Random(seed)
+    body = " ".join(rng.choice(SENTENCES) for _ in range(sentence_count))
+    return {
+        "id": f"bench{seed}",
+        "title": f"AITA for billing my sister for party cleanup? ({seed})",
+        "body": body,
+        "score": 100 + seed,
+        "num_comments": 10,
+        "url": "",
+        "subreddit": "AmItheAsshole",
+    }
+
+
+def make_stories(count, min_sentences=3, max_sentences=40, seed=0):
+    """Stories of varied length (short, typical and over the duration limit)."""
+    rng = random.Random(seed)
+    return [make_story(rng.randint(min_sentences, max_sentences), seed + i) for i in range(count)]
+
+
+def make_listing_posts(count, seed=0):
+    """Objects with the praw Submission attributes filter_listing_posts reads."""
+    rng = random.Random(seed)
+    posts = []
+    for i in range(count):
+        story = make_story(rng.randint(0, 60), seed + i)
+        title = story["title"]
+        if rng.random() < 0.1:
+            title = rng.choice(UPDATE_PREFIXES) + title
+        posts.append(SimpleNamespace(
+            id=story["id"], title=title, selftext=story["body"],
+            score=rng.randint(0, 5000), num_comments=rng.randint(0, 500),
+            stickied=rng.random() < 0.02,
+        ))
+    return posts
+
+
+def fake_tts(text, output_file, duration):
+    """Fake TTS: write `duration` seconds of silent 16-bit mono audio and return the path."""
+    sample_rate = 24000
+    with wave.open(output_file, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        silence = b"\x00\x00" * sample_rate
+        for _ in range(int(duration)):
+            wav_file.writeframes(silence)
+        wav_file.writeframes(b"\x00\x00" * int((duration % 1) * sample_rate))
+    return output_file
+
+
+def make_background_video(output_file, seconds=BACKGROUND_SECONDS, size=BACKGROUND_SIZE, fps=BACKGROUND_FPS):
+    """Generate a moving test-pattern background video with a quiet tone track (cached by path)."""
+    if os.path.exists(output_file):
+        return output_file
+    width, height = size
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest", output_file
+    ], check=True)
+    return output_file
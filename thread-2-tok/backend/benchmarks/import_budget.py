@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Import Budget
+Checks that `import app` stays cheap: it is timed in fresh interpreters (median
+of several runs) against a wall-time budget, and none of the heavy dependencies
+(moviepy, numpy, PIL, praw, edge_tts, tiktok_voice_api, requests) may be loaded
+by the import itself. Exits non-zero when either check fails.
+
+Usage: python benchmarks/import_budget.py [--budget 0.5] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_IMPORT_BUDGET = float(os.getenv("IMPORT_BUDGET_SECONDS", "0.5"))
+HEAVY_MODULES = ("moviepy", "numpy", "PIL", "praw", "edge_tts", "tiktok_voice_api", "requests")
+
+# Runs in the child interpreter: time `import app` and list which heavy modules it pulled in
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+heavy = sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure_import():
+    """Import app in a fresh interpreter. Returns (seconds, heavy modules loaded)."""
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report["seconds"], report["heavy"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the start-up cost of importing app.py.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_IMPORT_BUDGET, help="allowed median seconds")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    args = parser.parse_args(argv)
+
+    timings = []
+    heavy = set()
+    for _ in range(args.runs):
+        try:
+            seconds, loaded = measure_import()
+        except subprocess.CalledProcessError as e:
+            print(f"❌ import app failed:\n{e.stderr}")
+            return 1
+        timings.append(seconds)
+        heavy.update(loaded)
+
+    median = statistics.median(timings)
+    print(f"⏱️ import app: median {median * 1000:.0f} ms, best {min(timings) * 1000:.0f} ms "
+          f"over {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+
+    failed = False
+    if heavy:
+        print(f"❌ Heavy modules loaded at import time: {', '.join(sorted(heavy))}")
+        failed = True
+    if median > args.budget:
+        print(f"❌ import app is over budget by {(median - args.budget) * 1000:.0f} ms")
+        failed = True
+    if not failed:
+        print("✅ Import budget met")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmarks
+Times each generation stage on synthetic fixtures (no Reddit, no TTS service):
+candidate filtering, text wrapping, caption rasterization, caption assembly,
+audio mixing and full create_video renders. Every stage runs in a fresh process
+so its peak RSS is its own. Results can be saved as a baseline and later runs
+compared against it; a regression makes the script exit non-zero.
+
+Usage: python benchmarks/run_benchmarks.py [--quick] [--stages ...] [--save-baseline]
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+TIME_THRESHOLD = 0.15  # Slower than baseline by more than this fraction is a regression
+RSS_THRESHOLD = 0.25
+
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def _peak_rss_mb(who):
+    """Peak resident set size in MB (None where the resource module is unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Each stage does its setup and returns (run, items, unit); only run() is timed
+
+def stage_candidate_filtering(app, workspace, quick):
+    from fixtures import make_listing_posts, make_stories
+
+    stories = make_stories(200 if quick else 2000)
+    posts = make_listing_posts(200 if quick else 2000)
+
+    def run():
+        for story in stories:
+            app.validate_story_length(story)
+        app.filter_listing_posts(posts)
+
+    return run, len(stories) + len(posts), "stories"
+
+
+def stage_wrap_text(app, workspace, quick):
+    from PIL import Image, ImageDraw
+    from fixtures import make_stories
+
+    texts = [story["body"] for story in make_stories(20 if quick else 100)]
+    font = app.get_caption_font(60)
+    draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+    def run():
+        for text in texts:
+            app.wrap_text_to_width(text, font, 1000, draw)
+
+    return run, len(texts), "texts"
+
+
+def stage_caption_image(app, workspace, quick):
+    from fixtures import SENTENCES
+
+    texts = SENTENCES * (2 if quick else 10)
+
+    def run():
+        for text in texts:
+            app.create_caption_image(text, width=1080, height=100)
+
+    return run, len(texts), "captions"
+
+
+def stage_caption_assembly(app, workspace, quick):
+    import numpy as np
+    from fixtures import fake_tts, make_story
+
+    duration = 20 if quick else 60
+    text = f"{make_story(25)['title']} {make_story(25)['body']}"
+    narration = fake_tts(text, os.path.join(workspace, "assembly_narration.wav"), duration)
+    frame = np.zeros((1920, 1080, 3), dtype=np.uint8)
+    frame_times = [i / 24 for i in range(int(duration * 24))]
+
+    def run():
+        cues = app.create_accurate_captions(text, narration, (1080, 1920), audio_duration=duration)
+        track = app.CaptionTrack(cues, (1080, 1920))
+        for t in frame_times:
+            track.blend(frame, t)
+
+    return run, len(frame_times), "frames"
+
+
+def stage_audio_mix(app, workspace, quick):
+    from moviepy.editor import AudioFileClip, CompositeAudioClip
+    from create_lofi_background import create_lofi_loop
+    from fixtures import fake_tts
+    from music_library import MusicLibrary
+
+    duration = 20 if quick else 90
+    narration = fake_tts("", os.path.join(workspace, "mix_narration.wav"), duration)
+    music_dir = os.path.join(workspace, "music")
+    loop_file = create_lofi_loop(filename=os.path.join(music_dir, "loop.wav"))
+    library = MusicLibrary(music_dir=music_dir, loop_files=(loop_file,), cache_dir=os.path.join(workspace, "music_cache"))
+    track = library.pick_track()
+
+    def run():
+        narration_audio = AudioFileClip(narration)
+        mix = CompositeAudioClip([
+            narration_audio.volumex(0.9),
+            library.audio_clip(track, duration).volumex(0.15 * 0.15),
+        ])
+        mix.to_soundarray(fps=44100, nbytes=2)
+        narration_audio.close()
+
+    return run, duration, "audio seconds"
+
+
+def _render_stage(backend):
+    def stage(app, workspace, quick):
+        from fixtures import fake_tts, make_background_video, make_story
+
+        duration = 5 if quick else 15
+        story = make_story(6)
+        text = f"{story['title']} {story['body']}"
+        background = make_background_video(os.path.join(workspace, "background.mp4"))
+        narration = fake_tts(text, os.path.join(workspace, f"render_narration_{backend}.wav"), duration)
+        output_file = os.path.join(workspace, f"render_{backend}.mp4")
+
+        def run():
+            if not app.create_video(background, narration, output_file, text, backend=backend,
+                                    work_dir=workspace, profile="draft" if quick else None):
+                raise RuntimeError(f"{backend} render failed")
+
+        return run, duration, "video seconds"
+
+    return stage
+
+
+STAGES = {
+    "candidate_filtering": stage_candidate_filtering,
+    "wrap_text": stage_wrap_text,
+    "caption_image": stage_caption_image,
+    "caption_assembly": stage_caption_assembly,
+    "audio_mix": stage_audio_mix,
+    "render_moviepy": _render_stage("moviepy"),
+    "render_ffmpeg": _render_stage("ffmpeg"),
+}
+SINGLE_RUN_STAGES = ("render_moviepy", "render_ffmpeg")
+
+
+def run_stage(name, workspace, quick, repeats):
+    """Child process: set up one stage, time it `repeats` times and report throughput and peak RSS."""
+    os.chdir(BACKEND_DIR)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import app
+
+        run, items, unit = STAGES[name](app, workspace, quick)
+        run()  # Warm-up (font cache, imports, decoder start-up)
+        timings = []
+        for _ in range(1 if name in SINGLE_RUN_STAGES else repeats):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+
+    seconds = statistics.median(timings)
+    return {
+        "seconds": seconds,
+        "best_seconds": min(timings),
+        "items": items,
+        "unit": unit,
+        "throughput": items / seconds if seconds else None,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        "child_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+    }
+
+
+def compare(results, baseline, time_threshold=TIME_THRESHOLD, rss_threshold=RSS_THRESHOLD):
+    """Return a list of regression messages for stages slower or bigger than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("stages", {}).get(name)
+        if not base or "error" in result or "error" in base:
+            continue
+        if result["seconds"] > base["seconds"] * (1 + time_threshold):
+            regressions.append(f"{name}: {result['seconds']:.3f}s vs baseline {base['seconds']:.3f}s "
+                               f"(+{(result['seconds'] / base['seconds'] - 1) * 100:.0f}%)")
+        if result.get("peak_rss_mb") and base.get("peak_rss_mb") \
+                and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + rss_threshold):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mb']:.0f} MB vs baseline "
+                               f"{base['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def print_table(results, baseline=None):
+    print(f"\n{'stage':<22}{'median':>10}{'throughput':>26}{'peak RSS':>12}{'vs baseline':>14}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<22}  ❌ {result['error']}")
+            continue
+        base = (baseline or {}).get("stages", {}).get(name)
+        delta = f"{(result['seconds'] / base['seconds'] - 1) * 100:+.0f}%" if base and base.get("seconds") else "-"
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] else "-"
+        throughput = f"{result['throughput']:.1f} {result['unit']}/s"
+        print(f"{name:<22}{result['seconds']:>9.3f}s{throughput:>26}{rss:>12}{delta:>14}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the video generation pipeline.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="stages to run")
+    parser.add_argument("--quick", action="store_true", help="smaller fixtures and draft renders")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per stage (renders run once)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE_FILE), help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=TIME_THRESHOLD,
+                        help="allowed slowdown before a stage counts as a regression (0.15 = 15%%)")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as workspace:
+        for name in args.stages:
+            print(f"⏱️ {name}...")
+            # Fresh interpreter per stage, so peak RSS and caches are per stage
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                try:
+                    results[name] = pool.submit(run_stage, name, workspace, args.quick, args.repeats).result()
+                except Exception as e:
+                    results[name] = {"error": str(e)}
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("⚠️ Baseline was recorded with a different --quick setting, not comparing")
+            baseline = None
+
+    print_table(results, baseline)
+    report = {
+        "created_at": time.time(),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "quick": args.quick,
+        "stages": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = [name for name, result in results.items() if "error" in result]
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    for message in regressions:
+        print(f"❌ Regression: {message}")
+
+    if args.save_baseline:
+        if baseline:
+            # Keep stages that were not part of this run
+            report["stages"] = dict(baseline.get("stages", {}), **results)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
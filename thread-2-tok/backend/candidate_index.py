@@ -0,0 +1,167 @@
+"""
+Candidate Index
+Persistent SQLite index of Reddit posts that passed the story filters, so story
+selection can run as a query instead of re-walking every listing on each run.
+"""
+
+import sqlite3
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+CANDIDATE_INDEX_FILE = "candidate_index.db"
+
+# Listings fetched more recently than this are served from the index
+LISTING_TTL = 6 * 3600
+# Candidates not seen in any listing for this long are no longer offered
+CANDIDATE_TTL = 3 * 24 * 3600
+# Used stories become selectable again after this long (matches used_stories.json)
+USED_TTL = 7 * 24 * 3600
+
+STATUS_FRESH = "fresh"
+STATUS_USED = "used"
+STATUS_BLACKLISTED = "blacklisted"
+
+# Lightweight stand-in for a praw Submission (same attribute names we rely on)
+IndexedPost = namedtuple(
+    "IndexedPost",
+    ["id", "subreddit", "title", "selftext", "score", "num_comments", "permalink", "estimated_duration"]
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    subreddit TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    num_comments INTEGER NOT NULL,
+    permalink TEXT NOT NULL,
+    title_length INTEGER NOT NULL,
+    body_length INTEGER NOT NULL,
+    estimated_duration REAL NOT NULL,
+    fetched_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'fresh',
+    status_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_selection
+    ON candidates (subreddit, status, fetched_at, score);
+CREATE TABLE IF NOT EXISTS listings (
+    subreddit TEXT NOT NULL,
+    sort TEXT NOT NULL,
+    time_filter TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (subreddit, sort, time_filter)
+);
+"""
+
+
+@contextmanager
+def _open_index(db_file=None):
+    """Open the index (one short-lived connection per call keeps it thread/process safe)."""
+    conn = sqlite3.connect(db_file or CANDIDATE_INDEX_FILE, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def is_listing_fresh(subreddit, sort, time_filter, ttl=LISTING_TTL, db_file=None):
+    """Check whether a listing was fetched within the freshness TTL."""
+    try:
+        with _open_index(db_file) as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM listings WHERE subreddit = ? AND sort = ? AND time_filter = ?",
+                (subreddit.lower(), sort, time_filter or "")
+            ).fetchone()
+        return row is not None and time.time() - row[0] < ttl
+    except Exception as e:
+        print(f"Error reading candidate index: {e}")
+        return False
+
+
+def record_listing(subreddit, sort, time_filter, posts, estimate_duration, db_file=None, complete=True):
+    """
+    Upsert the qualified posts of a freshly fetched listing and mark the listing as fetched
+    (unless it was only partly read, complete=False).
+    """
+    now = time.time()
+    rows = []
+    for post in posts:
+        rows.append((
+            post.id, subreddit.lower(), post.title, post.selftext, post.score, post.num_comments,
+            post.permalink, len(post.title), len(post.selftext),
+            estimate_duration(f"{post.title} {post.selftext}"), now
+        ))
+
+    try:
+        with _open_index(db_file) as conn:
+            # Refresh listing data but never resurrect used/blacklisted candidates
+            conn.executemany(
+                """
+                INSERT INTO candidates (id, subreddit, title, body, score, num_comments, permalink,
+                                        title_length, body_length, estimated_duration, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    score = excluded.score,
+                    num_comments = excluded.num_comments,
+                    fetched_at = excluded.fetched_at
+                """,
+                rows
+            )
+            if complete:
+                conn.execute(
+                    "INSERT OR REPLACE INTO listings (subreddit, sort, time_filter, fetched_at) VALUES (?, ?, ?, ?)",
+                    (subreddit.lower(), sort, time_filter or "", now)
+                )
+    except Exception as e:
+        print(f"Error updating candidate index: {e}")
+
+
+def query_candidates(subreddits, max_duration=170, ttl=CANDIDATE_TTL, db_file=None):
+    """Return fresh, recently seen candidates for the given subreddits, best score first."""
+    names = [name.lower() for name in subreddits]
+    now = time.time()
+    placeholders = ", ".join("?" for _ in names)
+    try:
+        with _open_index(db_file) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT id, subreddit, title, body, score, num_comments, permalink, estimated_duration
+                FROM candidates
+                WHERE subreddit IN ({placeholders})
+                  AND (status = ? OR (status = ? AND status_at < ?))
+                  AND fetched_at >= ?
+                  AND estimated_duration <= ?
+                ORDER BY score DESC
+                """,
+                (*names, STATUS_FRESH, STATUS_USED, now - USED_TTL, now - ttl, max_duration)
+            ).fetchall()
+        return [IndexedPost(*row) for row in rows]
+    except Exception as e:
+        print(f"Error querying candidate index: {e}")
+        return []
+
+
+def set_candidate_status(story_id, status, db_file=None):
+    """Mark a candidate as used or blacklisted so it drops out of selection."""
+    try:
+        with _open_index(db_file) as conn:
+            conn.execute(
+                "UPDATE candidates SET status = ?, status_at = ? WHERE id = ?",
+                (status, time.time(), story_id)
+            )
+    except Exception as e:
+        print(f"Error updating candidate status: {e}")
+
+
+def reset_used_candidates(db_file=None):
+    """Make used (but not blacklisted) candidates selectable again."""
+    try:
+        with _open_index(db_file) as conn:
+            conn.execute("UPDATE candidates SET status = ? WHERE status = ?", (STATUS_FRESH, STATUS_USED))
+    except Exception as e:
+        print(f"Error resetting candidate index: {e}")
@@ -0,0 +1,141 @@
+"""
+Candidate Pool
+Session-scoped pool of fresh candidates for one set of subreddits. Stories are
+drawn with quality-weighted probability from a Fenwick tree of weights, so every
+draw and removal is O(log n); the pool only goes back to the candidate index (and
+Reddit) when it runs low or gets old.
+"""
+
+import random
+import threading
+import time
+
+# Refill when fewer candidates than this are left
+POOL_LOW_WATER = 5
+# Rebuild a pool this old even if it is not low (matches the listing TTL)
+POOL_MAX_AGE = 6 * 3600
+
+
+def quality_weight(score):
+    """Selection weight of a post: heavily favor high scores."""
+    if score >= 100:
+        return score * 3  # 3x weight for 100+ scores
+    elif score >= 50:
+        return score * 2  # 2x weight for 50+ scores
+    elif score >= 20:
+        return score * 1.5  # 1.5x weight for 20+ scores
+    return score  # Normal weight for lower scores
+
+
+class FenwickSampler:
+    """Weighted sampling without replacement: O(n) build, O(log n) sample and remove."""
+
+    def __init__(self, weights):
+        self.weights = [max(0, weight) for weight in weights]
+        self.size = len(self.weights)
+        self.tree = [0] + self.weights  # 1-based, built in place in O(n)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.total = sum(self.weights)
+        self.remaining = sum(1 for weight in self.weights if weight > 0)
+
+    def _add(self, index, delta):
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def remove(self, index):
+        """Take item `index` out of the draw."""
+        weight = self.weights[index]
+        if weight > 0:
+            self.weights[index] = 0
+            self._add(index, -weight)
+            self.total -= weight
+            self.remaining -= 1
+
+    def find(self, target):
+        """Index of the item whose cumulative weight range contains target (0 <= target < total)."""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                position = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        # Float drift can land on a removed item at the very end, step back to a live one
+        while position >= self.size or self.weights[position] == 0:
+            position -= 1
+        return position
+
+    def sample(self, rng=random):
+        """Random index with probability proportional to its weight, or None when empty."""
+        if self.remaining <= 0:
+            return None
+        return self.find(rng.random() * self.total)
+
+
+class CandidatePool:
+    """
+    Fresh candidates of one subreddit selection, loaded once and drawn from until low.
+    `load()` returns the current fresh candidate posts (refreshing listings as needed).
+    """
+
+    def __init__(self, load, low_water=POOL_LOW_WATER, max_age=POOL_MAX_AGE):
+        self.load = load
+        self.low_water = low_water
+        self.max_age = max_age
+        self.lock = threading.RLock()
+        self.posts = []
+        self.positions = {}
+        self.sampler = FenwickSampler([])
+        self.loaded_at = None
+
+    def __len__(self):
+        return self.sampler.remaining
+
+    def refill(self):
+        """Reload the pool from `load()` (O(n) rebuild)."""
+        with self.lock:
+            self.posts = list(self.load())
+            self.positions = {post.id: i for i, post in enumerate(self.posts)}
+            self.sampler = FenwickSampler([quality_weight(post.score) for post in self.posts])
+            self.loaded_at = time.time()
+
+            scores = sorted((post.score for post in self.posts), reverse=True)
+            if scores:
+                print(f"  📊 Score range: {min(scores)} - {max(scores)} (avg: {sum(scores)//len(scores)})")
+                print(f"  🏆 Top scores available: {scores[:5]}")
+            return len(self.posts)
+
+    def needs_refill(self):
+        return (self.loaded_at is None or len(self) < self.low_water
+                or time.time() - self.loaded_at > self.max_age)
+
+    def remove(self, post_id):
+        """Drop a candidate (used or rejected elsewhere) from the draw."""
+        with self.lock:
+            index = self.positions.get(post_id)
+            if index is not None:
+                self.sampler.remove(index)
+
+    def take(self, excluded_ids=()):
+        """
+        Draw a quality-weighted candidate and remove it from the pool, refilling first when
+        the pool is low. Candidates in excluded_ids are dropped. Returns (post, probability) or None.
+        """
+        with self.lock:
+            if self.needs_refill():
+                self.refill()
+            while True:
+                index = self.sampler.sample()
+                if index is None:
+                    return None
+                post = self.posts[index]
+                probability = self.sampler.weights[index] / self.sampler.total
+                self.sampler.remove(index)
+                if post.id not in excluded_ids:
+                    return post, probability
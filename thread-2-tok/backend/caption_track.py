@@ -0,0 +1,102 @@
+"""
+Caption Track
+Single time-indexed caption layer: caption bitmaps are kept sorted by start time
+and only the caption active at time t is blended into each frame, so per-frame
+cost does not grow with the number of captions.
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+# One caption on the timeline; image is an RGBA numpy array from create_caption_image
+CaptionCue = namedtuple("CaptionCue", ["text", "start", "end", "image"])
+
+
+class CaptionTrack:
+    """Overlay for a base clip that shows at most one caption per frame."""
+
+    def __init__(self, cues, frame_size, position=("center", 0.5)):
+        self.cues = sorted(cues, key=lambda cue: cue.start)
+        self.starts = [cue.start for cue in self.cues]
+        self.frame_width, self.frame_height = frame_size
+        self.position = position
+        self.prepared = {}
+        self.images = {}
+
+    def __len__(self):
+        return len(self.cues)
+
+    @property
+    def end(self):
+        return max((cue.end for cue in self.cues), default=0)
+
+    def placement(self, image):
+        """Top-left corner of a caption, matching ImageClip.set_position(('center', 0.5), relative=True)."""
+        image_height, image_width = image.shape[:2]
+        x, y = self.position
+        x = (self.frame_width - image_width) / 2 if x == "center" else x * self.frame_width
+        y = (self.frame_height - image_height) / 2 if y == "center" else y * self.frame_height
+        return int(x), int(y)
+
+    def image(self, index):
+        """RGBA array of a cue; waits for it if the cue holds a Future that is still rasterizing."""
+        if index not in self.images:
+            image = self.cues[index].image
+            if hasattr(image, "result"):
+                image = image.result()
+            self.images[index] = image
+        return self.images[index]
+
+    def _prepare(self, index):
+        """Clip a caption to the frame and pre-split it into premultiplied color and alpha."""
+        if index not in self.prepared:
+            image = self.image(index)
+            if image is None:
+                self.prepared[index] = None
+                return None
+            x, y = self.placement(image)
+            image_height, image_width = image.shape[:2]
+
+            # Visible part of the caption inside the frame
+            x1, y1 = max(0, x), max(0, y)
+            x2, y2 = min(self.frame_width, x + image_width), min(self.frame_height, y + image_height)
+            if x2 <= x1 or y2 <= y1:
+                self.prepared[index] = None
+                return None
+
+            import numpy as np
+
+            visible = image[y1 - y:y2 - y, x1 - x:x2 - x]
+            alpha = visible[..., 3:4].astype(np.float32) / 255.0
+            color = visible[..., :3].astype(np.float32) * alpha
+            self.prepared[index] = ((slice(y1, y2), slice(x1, x2)), color, 1.0 - alpha)
+        return self.prepared[index]
+
+    def active_index(self, t):
+        """Index of the caption shown at time t, or None."""
+        index = bisect_right(self.starts, t) - 1
+        if index >= 0 and t < self.cues[index].end:
+            return index
+        return None
+
+    def blend(self, frame, t):
+        """Return the frame with the active caption (if any) blended on top."""
+        index = self.active_index(t)
+        if index is None:
+            return frame
+
+        prepared = self._prepare(index)
+        if prepared is None:
+            return frame
+
+        import numpy as np
+
+        region, color, inverse_alpha = prepared
+        # Never write into the reader's frame buffer, it may be cached and reused
+        frame = np.array(frame)
+        frame[region] = (frame[region] * inverse_alpha + color).astype(np.uint8)
+        return frame
+
+    def apply(self, clip):
+        """Return a copy of clip with the caption track burned in (audio is kept)."""
+        return clip.fl(lambda get_frame, t: self.blend(get_frame(t), t))
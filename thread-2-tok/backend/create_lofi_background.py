@@ -1,50 +1,78 @@
 import numpy as np
-from scipy.io.wavfile import write
 import os
+import wave
+
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 65536  # Samples synthesized per block, memory stays flat for any duration
+
+# (frequency in Hz, amplitude) of each sine layer
+LOFI_LAYERS = [
+    (55, 0.3),    # Low frequency bass, A1 note
+    (220, 0.2),   # Mid frequency ambient tones, A3 note
+    (330, 0.15),  # E4 note
+    (440, 0.1),   # High frequency subtle tones, A4 note
+    (0.1, 0.05),  # Gentle modulation
+]
+# Every layer repeats after this many seconds (the 0.1 Hz modulation sets the period)
+LOFI_LOOP_PERIOD = 10
+
+def lofi_blocks(duration, sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE, fade_seconds=2.0):
+    """Yield the ambient track as float32 blocks of at most block_size samples."""
+    total_samples = int(sample_rate * duration)
+    fade_samples = min(int(sample_rate * fade_seconds), total_samples // 2)
+    # Phases are computed from integer sample indices (frequencies in tenths of a Hz), so they
+    # are exact at any position and a track of whole loop periods wraps around seamlessly
+    cycle = 10 * sample_rate
+
+    for block_start in range(0, total_samples, block_size):
+        index = np.arange(block_start, min(block_start + block_size, total_samples), dtype=np.int64)
+        block = np.zeros(len(index), dtype=np.float32)
+        for frequency, amplitude in LOFI_LAYERS:
+            phase = (index * int(round(frequency * 10))) % cycle
+            block += amplitude * np.sin((2 * np.pi / cycle) * phase).astype(np.float32)
+
+        # Apply gentle fade in/out
+        if fade_samples:
+            block *= np.clip(np.minimum(index, total_samples - 1 - index) / fade_samples, 0, 1).astype(np.float32)
+        yield block
+
+def write_wav_blocks(filename, blocks, sample_rate=SAMPLE_RATE):
+    """Stream float blocks into a mono 16-bit WAV file."""
+    with wave.open(filename, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        for block in blocks:
+            # Normalize and convert to 16-bit
+            wav_file.writeframes((np.clip(block, -1, 1) * 32767).astype("<i2").tobytes())
 
 def create_simple_lofi_background(duration=300, filename="static/lofi_background.wav"):
     """Create a simple ambient background track."""
     try:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(filename), exist_ok=True)
-        
-        sample_rate = 44100
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
-        
-        # Create a simple ambient sound with multiple sine waves
-        # Low frequency bass
-        bass = 0.3 * np.sin(2 * np.pi * 55 * t)  # A1 note
-        
-        # Mid frequency ambient tones
-        mid1 = 0.2 * np.sin(2 * np.pi * 220 * t)  # A3 note
-        mid2 = 0.15 * np.sin(2 * np.pi * 330 * t)  # E4 note
-        
-        # High frequency subtle tones
-        high = 0.1 * np.sin(2 * np.pi * 440 * t)  # A4 note
-        
-        # Add some gentle modulation
-        modulation = 0.05 * np.sin(2 * np.pi * 0.1 * t)
-        
-        # Combine all frequencies
-        audio = bass + mid1 + mid2 + high + modulation
-        
-        # Apply gentle fade in/out
-        fade_samples = int(sample_rate * 2)  # 2 second fade
-        audio[:fade_samples] *= np.linspace(0, 1, fade_samples)
-        audio[-fade_samples:] *= np.linspace(1, 0, fade_samples)
-        
-        # Normalize and convert to 16-bit
-        audio = np.clip(audio, -1, 1)
-        audio_16bit = (audio * 32767).astype(np.int16)
-        
-        # Save as WAV file
-        write(filename, sample_rate, audio_16bit)
+
+        write_wav_blocks(filename, lofi_blocks(duration))
         print(f"Created ambient background track: {filename}")
         return filename
-        
+
     except Exception as e:
         print(f"Error creating background music: {e}")
         return None
 
+def create_lofi_loop(periods=1, filename="static/lofi_loop.wav"):
+    """Create a short tile of the ambient track that loops seamlessly (no fades)."""
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        write_wav_blocks(filename, lofi_blocks(LOFI_LOOP_PERIOD * periods, fade_seconds=0))
+        print(f"Created loopable ambient tile: {filename} ({LOFI_LOOP_PERIOD * periods}s)")
+        return filename
+
+    except Exception as e:
+        print(f"Error creating background loop: {e}")
+        return None
+
 if __name__ == "__main__":
-    create_simple_lofi_background()
\ No newline at end of file
+    create_simple_lofi_background()
+    create_lofi_loop()
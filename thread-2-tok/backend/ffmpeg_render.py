@@ -0,0 +1,181 @@
+"""
+FFmpeg Render Backend
+Renders the final video with one ffmpeg invocation: input seek, 9:16 crop,
+caption overlay from pre-rendered PNGs, narration/music mix and libx264/aac
+encode. No video frames pass through Python.
+"""
+
+import json
+import os
+import subprocess
+
+import metrics
+
+
+def probe_media(path):
+    """Return ffprobe's format/stream info for a media file."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration:stream=codec_type,width,height",
+         "-of", "json", path],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def probe_duration(path):
+    """Return the duration of a media file in seconds."""
+    return float(probe_media(path)["format"]["duration"])
+
+
+def compute_vertical_crop(video_width, video_height, target_aspect_ratio=9 / 16):
+    """
+    Return (x1, y1, x2, y2) of the centered 9:16 crop used by both render backends.
+    Width and height are rounded down to even numbers (yuv420p / libx264 reject odd sizes).
+    """
+    if video_width / video_height > target_aspect_ratio:
+        # Crop width (landscape video)
+        new_width = int(video_height * target_aspect_ratio)
+        new_width -= new_width % 2
+        new_height = video_height - video_height % 2
+    else:
+        # Crop height (portrait video)
+        new_height = int(video_width / target_aspect_ratio)
+        new_height -= new_height % 2
+        new_width = video_width - video_width % 2
+    crop_x1 = (video_width - new_width) // 2
+    crop_y1 = (video_height - new_height) // 2
+    return crop_x1, crop_y1, crop_x1 + new_width, crop_y1 + new_height
+
+
+def _concat_path(path):
+    """Quote a path for an ffconcat script."""
+    return "'" + os.path.abspath(path).replace("\\", "/").replace("'", "'\\''") + "'"
+
+
+def write_caption_overlay(caption_track, duration, work_dir):
+    """
+    Write the caption track as a PNG slideshow (ffconcat script) on one shared canvas.
+    Returns (script_path, (x, y)) where (x, y) is the canvas position in the frame
+    (script_path is None when no caption could be rasterized).
+    """
+    import numpy as np
+    from PIL import Image
+
+    cues = []
+    for index, cue in enumerate(caption_track.cues):
+        image = caption_track.image(index)
+        if image is not None:
+            cues.append(cue._replace(image=image))
+    if not cues:
+        return None, (0, 0)
+    placements = [caption_track.placement(cue.image) for cue in cues]
+
+    # Canvas covering every caption so ffmpeg sees a constant-size stream
+    left = min(x for x, _ in placements)
+    top = min(y for _, y in placements)
+    right = max(x + cue.image.shape[1] for (x, _), cue in zip(placements, cues))
+    bottom = max(y + cue.image.shape[0] for (_, y), cue in zip(placements, cues))
+    canvas_size = (bottom - top, right - left, 4)
+
+    blank_path = os.path.join(work_dir, "caption_blank.png")
+    Image.fromarray(np.zeros(canvas_size, dtype=np.uint8)).save(blank_path, compress_level=1)
+
+    lines = ["ffconcat version 1.0"]
+    current_time = 0.0
+    last_path = blank_path
+    for index, ((x, y), cue) in enumerate(zip(placements, cues)):
+        start = max(cue.start, current_time)
+        end = min(cue.end, duration)
+        if end <= start:
+            continue
+        if start > current_time:
+            lines += [f"file {_concat_path(blank_path)}", f"duration {start - current_time:.3f}"]
+
+        canvas = np.zeros(canvas_size, dtype=np.uint8)
+        image_height, image_width = cue.image.shape[:2]
+        canvas[y - top:y - top + image_height, x - left:x - left + image_width] = cue.image
+        last_path = os.path.join(work_dir, f"caption_{index:04d}.png")
+        Image.fromarray(canvas).save(last_path, compress_level=1)
+
+        lines += [f"file {_concat_path(last_path)}", f"duration {end - start:.3f}"]
+        current_time = end
+
+    if current_time < duration:
+        last_path = blank_path
+        lines += [f"file {_concat_path(blank_path)}", f"duration {duration - current_time:.3f}"]
+    # The concat demuxer needs the last entry repeated for its duration to apply
+    lines.append(f"file {_concat_path(last_path)}")
+
+    script_path = os.path.join(work_dir, "captions.ffconcat")
+    with open(script_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return script_path, (left, top)
+
+
+def render_with_ffmpeg(input_video_file, input_audio_file, output_path, start_time, duration, crop,
+                       caption_track=None, music_file=None, music_volume=0.0225,
+                       ambient_volume=0.0075, narration_volume=0.9, work_dir=".", fps=24, music_input=None,
+                       encoder_args=None, output_height=None):
+    """
+    Render the final video with a single ffmpeg filter graph. Returns output_path or None.
+    music_input (complete ffmpeg input arguments for a bed at least `duration` long, see
+    MusicLibrary.ffmpeg_input) takes precedence over music_file, which is looped as-is.
+    encoder_args / output_height come from the render profile (see render_profiles.py).
+    """
+    x1, y1, x2, y2 = crop
+    has_ambient_audio = any(
+        stream.get("codec_type") == "audio" for stream in probe_media(input_video_file).get("streams", [])
+    )
+
+    command = ["ffmpeg", "-y", "-v", "error",
+               "-ss", f"{start_time:.3f}", "-t", f"{duration:.3f}", "-i", input_video_file,
+               "-i", input_audio_file]
+    input_count = 2
+
+    # Video: crop to 9:16, then overlay the caption slideshow
+    filters = [f"[0:v]crop={x2 - x1}:{y2 - y1}:{x1}:{y1},fps={fps}[base]"]
+    video_label = "[base]"
+    script_path = None
+    if caption_track is not None and len(caption_track):
+        with metrics.span("compositing", backend="ffmpeg", captions=len(caption_track)):
+            script_path, (caption_x, caption_y) = write_caption_overlay(caption_track, duration, work_dir)
+    if script_path:
+        command += ["-f", "concat", "-safe", "0", "-i", script_path]
+        filters.append(f"[{input_count}:v]format=rgba[captions]")
+        filters.append(f"[base][captions]overlay=x={caption_x}:y={caption_y}:eof_action=repeat[video]")
+        video_label = "[video]"
+        input_count += 1
+
+    # Scale last, so captions are composited at the crop's own resolution like the MoviePy backend
+    if output_height:
+        filters.append(f"{video_label}scale=-2:{output_height}[scaled]")
+        video_label = "[scaled]"
+
+    # Audio: narration plus looped lofi bed, or the background video's own audio as ambience
+    filters.append(f"[1:a]volume={narration_volume}[narration]")
+    if music_input or (music_file and os.path.exists(music_file)):
+        command += list(music_input) if music_input else ["-stream_loop", "-1", "-i", music_file]
+        filters.append(f"[{input_count}:a]volume={music_volume}[bed]")
+        input_count += 1
+    elif has_ambient_audio:
+        filters.append(f"[0:a]volume={ambient_volume}[bed]")
+    else:
+        filters.append("anullsrc=r=44100:cl=stereo[bed]")
+    filters.append("[narration][bed]amix=inputs=2:duration=first:dropout_transition=0:normalize=0[audio]")
+
+    command += [
+        "-filter_complex", ";".join(filters),
+        "-map", video_label, "-map", "[audio]",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", *(encoder_args or []),
+        "-c:a", "aac", "-ar", "44100",
+        "-t", f"{duration:.3f}", "-movflags", "+faststart",
+        output_path
+    ]
+
+    with metrics.span("encode", backend="ffmpeg", seconds=duration) as attrs:
+        result = subprocess.run(command, capture_output=True, text=True)
+        attrs["bytes"] = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+    if result.returncode != 0:
+        print(f"FFmpeg render failed: {result.stderr.strip()[-2000:]}")
+        return None
+    return output_path if os.path.exists(output_path) else None
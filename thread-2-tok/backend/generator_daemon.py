@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Generator Daemon
+Long-lived local worker that keeps the expensive parts of generation warm between
+videos: the MoviePy/numpy/PIL imports, the caption font, the decoded music
+library, an open background video reader and the candidate pool of every
+content path. It takes fetch and generate requests over a local socket (a
+UNIX socket, or a named pipe on Windows), one at a time, and streams the
+generator's output back to the caller.
+
+launcher.py uses it when it is running and generates in-process when it is not.
+
+Usage: python generator_daemon.py           (run the daemon in this window)
+       python generator_daemon.py --status  (check whether it is running)
+       python generator_daemon.py --stop
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import secrets
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+if os.name == "nt":
+    DAEMON_FAMILY = "AF_PIPE"
+    DEFAULT_DAEMON_ADDRESS = r"\\.\pipe\thread2tok-generator"
+else:
+    DAEMON_FAMILY = "AF_UNIX"
+    DEFAULT_DAEMON_ADDRESS = str(BACKEND_DIR / "generator_daemon.sock")
+DAEMON_ADDRESS = os.getenv("GENERATOR_DAEMON_ADDRESS", DEFAULT_DAEMON_ADDRESS)
+# Random key written at start-up; only processes that can read it may send requests
+DAEMON_KEY_FILE = os.getenv("GENERATOR_DAEMON_KEY_FILE", str(BACKEND_DIR / "generator_daemon.key"))
+
+
+class _ConnectionWriter(io.TextIOBase):
+    """
+    stdout replacement that forwards everything printed during a request to the client.
+    If the client goes away the output goes to the daemon's own console and the request finishes.
+    Worker threads (TTS, listings, captions) print too, so every send is serialized by a lock.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+
+    def writable(self):
+        return True
+
+    def send(self, message):
+        """Send one message to the client. Returns False if the client has gone away."""
+        with self.lock:
+            if self.conn is None:
+                return False
+            try:
+                self.conn.send(message)
+                return True
+            except (EOFError, OSError):
+                self.conn = None
+                return False
+
+    def write(self, text):
+        if text and self.send(("log", text)):
+            return len(text)
+        return sys.__stdout__.write(text)
+
+
+class DaemonClient:
+    """Connection details of a running daemon; every call opens its own connection."""
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+
+    @classmethod
+    def connect(cls, address=DAEMON_ADDRESS, key_file=DAEMON_KEY_FILE):
+        """Return a client if a daemon answers a ping, otherwise None."""
+        try:
+            with open(key_file, "rb") as f:
+                client = cls(address, f.read())
+            client.call("ping")
+            return client
+        except Exception:
+            return None
+
+    def call(self, op, **params):
+        """Send one request, print the daemon's output as it arrives and return its result."""
+        with Client(self.address, family=DAEMON_FAMILY, authkey=self.authkey) as conn:
+            conn.send(dict(params, op=op))
+            while True:
+                kind, value = conn.recv()
+                if kind == "log":
+                    print(value, end="", flush=True)
+                elif kind == "error":
+                    raise RuntimeError(value)
+                else:
+                    return value
+
+    def fetch_story(self, subreddits):
+        """app.fetch_story_from_multiple_subreddits, run by the daemon."""
+        try:
+            return self.call("fetch", subreddits=list(subreddits))
+        except Exception as e:
+            print(f"Error fetching story from the generator daemon: {e}")
+            return None
+
+    def generate_video(self, story, path_name, backend=None, profile=None):
+        """app.generate_approved_video, run by the daemon. Returns the video path or None."""
+        try:
+            return self.call("generate", story=story, path_name=path_name, backend=backend, profile=profile)
+        except Exception as e:
+            print(f"Error generating video with the generator daemon: {e}")
+            return None
+
+
+class GeneratorDaemon:
+    """Serves generation requests from one warm process."""
+
+    def __init__(self, address=DAEMON_ADDRESS, key_file=DAEMON_KEY_FILE):
+        self.address = address
+        self.key_file = key_file
+        self.started_at = time.time()
+        self.videos = 0
+        self.running = False
+        self.app = None
+
+    def warm_up(self):
+        """Load everything the first video would otherwise pay for."""
+        import app
+
+        self.app = app
+        steps = [
+            ("moviepy, numpy and PIL", lambda: __import__("moviepy.editor")),
+            ("caption font", lambda: app.get_caption_font(48)),
+            ("story history", lambda: (app.load_used_stories(), app.load_blacklisted_stories())),
+            ("candidate pools", self._warm_candidate_pools),
+            ("music library", self._warm_music),
+            ("background reader", self._warm_background),
+        ]
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step()
+                print(f"  ✅ {name} ({time.perf_counter() - started:.2f}s)")
+            except Exception as e:
+                print(f"  ⚠️ Could not warm up {name}: {e}")
+
+    def _warm_candidate_pools(self):
+        # One session pool per content path, so the first fetch of any path is a draw
+        for subreddits, path_name in self.app.SUBREDDIT_PATHS.values():
+            self.app.get_candidate_pool(subreddits).refill()
+
+    def _warm_music(self):
+        # Reading every cached track once keeps its PCM in the page cache
+        library = self.app.get_music_library()
+        for name in library.scan():
+            float(library.tracks[name][1].sum())
+
+    def _warm_background(self):
+        input_video = os.path.join(os.getcwd(), "static/minecraft_background.mp4")
+        background = self.app.prepare_background_segment(input_video, 60)
+        background.open()
+
+    def handle(self, request):
+        """Run one request and return its result."""
+        op = request.get("op")
+        if op == "ping":
+            return {"pid": os.getpid(), "uptime": time.time() - self.started_at, "videos": self.videos}
+        if op == "fetch":
+            return self.app.fetch_story_from_multiple_subreddits(request["subreddits"])
+        if op == "generate":
+            video_path = self.app.generate_approved_video(request["story"], request["path_name"],
+                                                          request.get("backend"), request.get("profile"))
+            if video_path:
+                self.videos += 1
+            return video_path
+        if op == "stop":
+            self.running = False
+            print("👋 Generator daemon stopping...")
+            return True
+        raise ValueError(f"Unknown request: {op}")
+
+    def _serve(self, conn):
+        try:
+            request = conn.recv()
+            writer = _ConnectionWriter(conn)
+            with contextlib.redirect_stdout(writer):
+                try:
+                    result = self.handle(request)
+                except Exception as e:
+                    writer.send(("error", str(e)))
+                    return
+            writer.send(("result", result))
+        except (EOFError, OSError) as e:
+            # The client went away (closed launcher window); the daemon keeps running
+            print(f"⚠️ Client disconnected: {e}")
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        """Warm up, then handle requests one at a time until a stop request."""
+        if DaemonClient.connect(self.address, self.key_file):
+            print(f"❌ A generator daemon is already running at {self.address}")
+            return 1
+        if DAEMON_FAMILY == "AF_UNIX" and os.path.exists(self.address):
+            os.remove(self.address)  # Left over from a daemon that did not shut down cleanly
+
+        print("🔥 Warming up...")
+        self.warm_up()
+
+        authkey = secrets.token_bytes(32)
+        with Listener(self.address, family=DAEMON_FAMILY, authkey=authkey) as listener:
+            fd = os.open(self.key_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(authkey)
+            print(f"🎬 Generator daemon ready at {self.address} (Ctrl+C to stop)")
+            self.running = True
+            try:
+                while self.running:
+                    try:
+                        conn = listener.accept()
+                    except Exception as e:
+                        # Wrong key or a half-open connection
+                        print(f"⚠️ Rejected connection: {e}")
+                        continue
+                    self._serve(conn)
+            except KeyboardInterrupt:
+                print("\n👋 Generator daemon stopping...")
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.key_file)
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep a warm video generator running for launcher.py.")
+    parser.add_argument("--status", action="store_true", help="report whether a daemon is running")
+    parser.add_argument("--stop", action="store_true", help="ask a running daemon to exit")
+    args = parser.parse_args(argv)
+
+    # Paths in app.py are relative to the backend directory
+    os.chdir(BACKEND_DIR)
+    if args.status or args.stop:
+        client = DaemonClient.connect()
+        if client is None:
+            print("❌ Generator daemon is not running")
+            return 1
+        if args.stop:
+            client.call("stop")
+        else:
+            status = client.call("ping")
+            print(f"✅ Generator daemon running (pid {status['pid']}, up {status['uptime'] / 60:.0f} min, "
+                  f"{status['videos']} videos)")
+        return 0
+    return GeneratorDaemon().serve_forever()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
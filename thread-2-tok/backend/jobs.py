@@ -0,0 +1,177 @@
+"""
+Job Manager
+Bounded queue of generation jobs worked off by background threads, with
+per-job progress events and cancellation. Used by the Flask job API so that
+request threads never block on TTS or encoding.
+"""
+
+import queue
+import threading
+import time
+import uuid
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue has no room for another job."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a runner when its job has been cancelled."""
+
+
+class Job:
+    """One generation request and its progress feed."""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.params = params
+        self.status = STATUS_QUEUED
+        self.stage = "queued"
+        self.progress = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.cancel_requested = threading.Event()
+        self.changed = threading.Condition(threading.RLock())  # Also guards status transitions
+        self.emit("queued", 0, "Waiting for a worker")
+
+    def emit(self, stage, progress=None, message=None):
+        """Record a progress event and wake up anyone following the feed."""
+        with self.changed:
+            self.stage = stage
+            if progress is not None:
+                self.progress = progress
+            self.events.append({
+                "index": len(self.events),
+                "time": time.time(),
+                "status": self.status,
+                "stage": stage,
+                "progress": self.progress,
+                "message": message,
+            })
+            self.changed.notify_all()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested (runners call this between stages)."""
+        if self.cancel_requested.is_set():
+            raise JobCancelled()
+
+    def wait_for_events(self, since, timeout=15):
+        """Block until there are events after index `since` (or the timeout passes)."""
+        with self.changed:
+            if len(self.events) <= since and self.status not in FINISHED_STATUSES:
+                self.changed.wait(timeout)
+            return self.events[since:]
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "params": self.params,
+            "error": self.error,
+            "has_result": self.result is not None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Runs jobs on a fixed number of worker threads fed from a bounded queue."""
+
+    def __init__(self, runner, workers=2, max_queue=20):
+        self.runner = runner
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def _ensure_workers(self):
+        with self.lock:
+            if self.threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, params):
+        """Queue a new job. Raises JobQueueFull when the queue is at capacity."""
+        self._ensure_workers()
+        job = Job(params)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            raise JobQueueFull(f"Job queue is full ({self.queue.maxsize} jobs waiting)")
+        with self.lock:
+            self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id):
+        """Request cancellation. Queued jobs are dropped, running jobs stop at the next stage."""
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with job.changed:
+            if job.status in FINISHED_STATUSES:
+                return False
+            job.cancel_requested.set()
+            if job.status == STATUS_QUEUED:
+                self._finish(job, STATUS_CANCELLED, "Cancelled before start")
+            else:
+                job.emit(job.stage, message="Cancellation requested")
+        return True
+
+    def _finish(self, job, status, message=None):
+        with job.changed:
+            if job.status in FINISHED_STATUSES:
+                return  # Already cancelled, the first final status wins
+            job.status = status
+            job.finished_at = time.time()
+            job.emit(status, 100 if status == STATUS_DONE else job.progress, message)
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                with job.changed:
+                    if job.status != STATUS_QUEUED:
+                        continue  # Cancelled while waiting
+                    job.status = STATUS_RUNNING
+                    job.started_at = time.time()
+                    job.emit("starting", 1)
+                job.result = self.runner(job)
+                if job.result:
+                    self._finish(job, STATUS_DONE, "Video ready")
+                else:
+                    job.error = job.error or "Generation failed"
+                    self._finish(job, STATUS_FAILED, job.error)
+            except JobCancelled:
+                self._finish(job, STATUS_CANCELLED, "Cancelled")
+            except Exception as e:
+                print(f"Error running job {job.id}: {e}")
+                job.error = str(e)
+                self._finish(job, STATUS_FAILED, job.error)
+            finally:
+                self.queue.task_done()
@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 """
 TikTok Video Generator Launcher
-Simple launcher that runs the main app with proper error handling
+Simple launcher that runs the main app with proper error handling. Stories are
+fetched and rendered by generator_daemon.py when it is running (warm imports,
+Reddit clients, music and background reader); otherwise everything runs here.
 """
 
+import argparse
 import os
 import sys
 import subprocess
-import time
 from pathlib import Path
 
+from generator_daemon import DaemonClient
+
 def print_header():
     print("\n" + "="*50)
     print("    🎬 TikTok Video Generator")
@@ -21,7 +25,22 @@ def print_status(message, status="info"):
     icon = icons.get(status, "•")
     print(f"{icon} {message}")
 
-def main():
+def generate_video():
+    """Run the interactive generator through the daemon if one is running. Returns the video path or None."""
+    import app
+    
+    client = DaemonClient.connect()
+    if client:
+        print_status("Using the running generator daemon", "success")
+        return app.main(fetch_story=client.fetch_story, generate_video=client.generate_video)
+    print_status("Generator daemon not running, generating in this window", "info")
+    return app.main()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate one TikTok video.")
+    parser.add_argument("--no-pause", action="store_true",
+                        help="don't wait for Enter at the end (the .bat/.ps1 wrappers pause themselves)")
+    args = parser.parse_args(argv)
     print_header()
     
     # Change to script directory
@@ -36,23 +55,21 @@ def main():
     print_status("• Rendering video for TikTok")
     print()
     
+    video_path = None
     try:
         # Run the main app
-        result = subprocess.run([sys.executable, "app.py"], 
-                              capture_output=False, 
-                              text=True)
+        video_path = generate_video()
         
-        if result.returncode == 0:
+        if video_path:
             print()
             print("="*50)
             print_status("Video Generation Complete!", "success")
             print("="*50)
             print()
             
-            # Find and open the most recent MP4 file
-            mp4_files = list(Path(".").glob("*.mp4"))
-            if mp4_files:
-                latest_video = max(mp4_files, key=lambda p: p.stat().st_mtime)
+            # Open the video that was just rendered
+            latest_video = Path(video_path)
+            if latest_video.exists():
                 print_status(f"Video created: {latest_video.name}", "success")
                 print_status("Opening video...", "info")
                 
@@ -77,15 +94,18 @@ def main():
         else:
             print_status("Video generation failed", "error")
             
-    except FileNotFoundError:
-        print_status("Error: app.py not found in current directory", "error")
+    except ImportError as e:
+        print_status(f"Error: could not load app.py ({e})", "error")
     except Exception as e:
         print_status(f"Error: {str(e)}", "error")
     
     print()
     print_status("Your video is ready to upload to TikTok!", "success")
     print()
-    input("Press Enter to exit...")
+    # Only wait for a keypress when someone is actually at the console
+    if sys.stdin.isatty() and not args.no_pause:
+        input("Press Enter to exit...")
+    return 0 if video_path else 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Metrics
+Lightweight stage instrumentation: `span(stage, **attributes)` times a block and
+records it in the active job trace (written as JSON when the job finishes) and in
+process-wide counters and histograms, which the Flask app exposes at /metrics.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+
+METRICS_TRACE_DIR = os.getenv("METRICS_TRACE_DIR", "traces")
+# Upper bounds (seconds) of the stage duration histogram buckets
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class MetricsRegistry:
+    """Process-wide counters and per-stage duration histograms."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram["counts"][index] += 1
+                    break
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+
+    def record_span(self, span):
+        """Fold a finished span (dict) into the counters and histograms."""
+        self.observe(span["name"], span["duration"])
+        for key, value in span["attributes"].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.increment(f"{span['name']}_{key}_total", value)
+        if span.get("error"):
+            self.increment(f"{span['name']}_errors_total")
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    stage: {"buckets": list(zip(self.buckets, histogram["counts"])),
+                            "count": histogram["count"], "sum": histogram["sum"]}
+                    for stage, histogram in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self):
+        """Counters and histograms in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE thread2tok_{name} counter", f"thread2tok_{name} {value}"]
+        lines.append("# TYPE thread2tok_stage_seconds histogram")
+        for stage, histogram in sorted(snapshot["histograms"].items()):
+            cumulative = 0
+            for bound, count in histogram["buckets"]:
+                cumulative += count
+                lines.append(f'thread2tok_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'thread2tok_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'thread2tok_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(f'thread2tok_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class Trace:
+    """Spans of one job, in completion order."""
+
+    def __init__(self, job_id=None, **attributes):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def merge(self, trace):
+        """Adopt the spans of a trace recorded in another process and count them here."""
+        for span in (trace or {}).get("spans", []):
+            self.add(span)
+            registry.record_span(span)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "id": self.id,
+                "attributes": self.attributes,
+                "started_at": self.started_at,
+                "duration": time.time() - self.started_at,
+                "spans": list(self.spans),
+            }
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """
+    Time a stage. Yields the attribute dict, so the block can add counts and bytes:
+        with span("tts", engine="edge") as attrs: ...; attrs["bytes"] = size
+    """
+    record = {
+        "id": uuid.uuid4().hex[:8],
+        "name": name,
+        "parent": _current_span.get(),
+        "thread": threading.current_thread().name,
+        "start": time.time(),
+        "attributes": attributes,
+    }
+    token = _current_span.set(record["id"])
+    started = time.perf_counter()
+    try:
+        yield attributes
+    except BaseException as e:
+        record["error"] = repr(e)
+        raise
+    finally:
+        record["duration"] = time.perf_counter() - started
+        _current_span.reset(token)
+        registry.record_span(record)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(record)
+
+
+@contextlib.contextmanager
+def job_trace(job_id=None, trace_dir=METRICS_TRACE_DIR, **attributes):
+    """Collect every span of the block into one Trace and write it to <trace_dir>/<id>.json (unless trace_dir is None)."""
+    trace = Trace(job_id, **attributes)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        registry.increment("jobs_total")
+        if trace_dir:
+            write_trace(trace.to_dict(), trace_dir)
+
+
+def write_trace(trace, trace_dir=METRICS_TRACE_DIR):
+    """Write a trace dict to <trace_dir>/<id>.json."""
+    try:
+        os.makedirs(trace_dir, exist_ok=True)
+        with open(os.path.join(trace_dir, f"{trace['id']}.json"), "w") as f:
+            json.dump(trace, f, indent=2)
+    except Exception as e:
+        print(f"Error writing trace {trace.get('id')}: {e}")
+
+
+def bind(function):
+    """Wrap function so it runs in the caller's trace/span context (for thread pool submissions)."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(function, *args, **kwargs)
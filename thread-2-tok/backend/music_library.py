@@ -0,0 +1,230 @@
+"""
+Music Library
+Every track in the music directory is decoded once into a loudness-normalized
+float32 PCM cache and memory-mapped from disk. Renders get a looped bed of any
+length that indexes straight into the mapped samples, so there is no decode per
+render and no copy of the whole track. Ordinary tracks are cross-faded at the
+loop seam with equal-power gains; seamless loop tiles are joined end to start.
+
+Usage: python music_library.py   (pre-decodes every track)
+"""
+
+import json
+import os
+import random
+import subprocess
+import threading
+
+import numpy as np
+
+MUSIC_DIR = os.getenv("MUSIC_DIR", "static/music")
+MUSIC_CACHE_DIR = os.getenv("MUSIC_CACHE_DIR", "music_cache")
+MUSIC_EXTENSIONS = (".wav", ".mp3", ".m4a", ".aac", ".ogg", ".flac")
+MUSIC_SAMPLE_RATE = 44100
+MUSIC_CHANNELS = 2
+MUSIC_TARGET_RMS_DB = -12.0  # Every track is scaled to this loudness (about the bundled lofi bed)
+MUSIC_BLOCK_SAMPLES = 1 << 20  # Samples per block when measuring / scaling the cache
+
+
+def _db(value):
+    return 20 * np.log10(max(value, 1e-9))
+
+
+class MusicLibrary:
+    """Decoded, normalized tracks keyed by file name."""
+
+    def __init__(self, music_dir=MUSIC_DIR, cache_dir=MUSIC_CACHE_DIR, extra_files=(), loop_files=(),
+                 sample_rate=MUSIC_SAMPLE_RATE, channels=MUSIC_CHANNELS):
+        self.music_dir = music_dir
+        self.cache_dir = cache_dir
+        self.extra_files = extra_files
+        # Tiles that loop seamlessly on their own (e.g. create_lofi_loop), never cross-faded
+        self.loop_files = loop_files
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.tracks = {}
+        self.lock = threading.Lock()
+
+    def sources(self):
+        """Audio files in the music directory plus any extra files that exist."""
+        files = []
+        if os.path.isdir(self.music_dir):
+            files = [os.path.join(self.music_dir, name) for name in sorted(os.listdir(self.music_dir))
+                     if name.lower().endswith(MUSIC_EXTENSIONS)]
+        return files + [path for path in tuple(self.extra_files) + tuple(self.loop_files) if os.path.exists(path)]
+
+    def is_seamless(self, name):
+        return name in {os.path.basename(path) for path in self.loop_files}
+
+    def _cache_paths(self, source_file):
+        name = os.path.splitext(os.path.basename(source_file))[0]
+        base = os.path.join(self.cache_dir, f"{name}.{self.sample_rate}x{self.channels}")
+        return f"{base}.f32", f"{base}.json"
+
+    def _decode(self, source_file, pcm_path, metadata_path):
+        """Decode a track to raw float32 PCM, normalize its loudness in place and write metadata."""
+        temp_path = f"{pcm_path}.{os.getpid()}.tmp"
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error", "-i", source_file, "-vn",
+            "-f", "f32le", "-acodec", "pcm_f32le", "-ar", str(self.sample_rate), "-ac", str(self.channels),
+            temp_path
+        ], check=True)
+
+        frames = os.path.getsize(temp_path) // (4 * self.channels)
+        samples = np.memmap(temp_path, dtype=np.float32, mode="r+", shape=(frames, self.channels))
+
+        # Loudness in blocks, so memory stays flat for long tracks
+        square_sum = 0.0
+        peak = 0.0
+        for start in range(0, frames, MUSIC_BLOCK_SAMPLES):
+            block = samples[start:start + MUSIC_BLOCK_SAMPLES]
+            square_sum += float(np.square(block, dtype=np.float64).sum())
+            peak = max(peak, float(np.abs(block).max(initial=0.0)))
+        rms = (square_sum / max(1, frames * self.channels)) ** 0.5
+
+        # Scale to the target loudness without clipping
+        gain = 10 ** ((MUSIC_TARGET_RMS_DB - _db(rms)) / 20) if rms > 0 else 1.0
+        if peak > 0:
+            gain = min(gain, 1.0 / peak)
+        for start in range(0, frames, MUSIC_BLOCK_SAMPLES):
+            samples[start:start + MUSIC_BLOCK_SAMPLES] *= gain
+        samples.flush()
+        del samples
+        os.replace(temp_path, pcm_path)
+
+        source_stat = os.stat(source_file)
+        metadata = {
+            "source": os.path.abspath(source_file),
+            "source_size": source_stat.st_size,
+            "source_mtime": source_stat.st_mtime,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "frames": frames,
+            "duration": frames / self.sample_rate,
+            "rms_db": _db(rms),
+            "peak_db": _db(peak),
+            "gain_db": _db(gain),
+            "normalized_rms_db": _db(rms * gain),
+        }
+        with open(f"{metadata_path}.{os.getpid()}.tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(f"{metadata_path}.{os.getpid()}.tmp", metadata_path)
+        return metadata
+
+    def _load(self, source_file):
+        """Return (metadata, memmap) for a track, decoding it first if the cache is missing or stale."""
+        pcm_path, metadata_path = self._cache_paths(source_file)
+        metadata = None
+        try:
+            with open(metadata_path, "r") as f:
+                metadata = json.load(f)
+            source_stat = os.stat(source_file)
+            if (metadata.get("source_size") != source_stat.st_size
+                    or metadata.get("source_mtime") != source_stat.st_mtime
+                    or not os.path.exists(pcm_path)):
+                metadata = None
+        except (FileNotFoundError, ValueError):
+            metadata = None
+
+        if metadata is None:
+            print(f"🎵 Decoding {os.path.basename(source_file)} into the music cache...")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            metadata = self._decode(source_file, pcm_path, metadata_path)
+
+        samples = np.memmap(pcm_path, dtype=np.float32, mode="r", shape=(metadata["frames"], self.channels))
+        metadata["path"] = pcm_path
+        return metadata, samples
+
+    def scan(self):
+        """Load (and decode if needed) every track. Returns the track names."""
+        with self.lock:
+            for source_file in self.sources():
+                name = os.path.basename(source_file)
+                if name in self.tracks:
+                    continue
+                try:
+                    self.tracks[name] = self._load(source_file)
+                except Exception as e:
+                    print(f"Error adding {source_file} to the music library: {e}")
+            return sorted(self.tracks)
+
+    def metadata(self, name):
+        return self.tracks[name][0]
+
+    def pick_track(self):
+        """Random track name, or None if the library is empty."""
+        names = self.scan()
+        return random.choice(names) if names else None
+
+    def bed(self, name, duration, crossfade=0.0):
+        """Looped bed of `duration` seconds from a track (see MusicBed). Seamless tiles ignore crossfade."""
+        metadata, samples = self.tracks[name]
+        return MusicBed(samples, self.sample_rate, duration, 0.0 if self.is_seamless(name) else crossfade)
+
+    def audio_clip(self, name, duration, crossfade=2.0):
+        """MoviePy AudioClip of a looped bed, read from the memory map as frames are requested."""
+        from moviepy.editor import AudioClip
+
+        bed = self.bed(name, duration, crossfade)
+        return AudioClip(bed.make_frame, duration=duration, fps=self.sample_rate)
+
+    def ffmpeg_input(self, name, duration, crossfade=2.0, work_dir="."):
+        """
+        ffmpeg input arguments for a bed of `duration` seconds. Seamless tiles loop the cached
+        PCM with -stream_loop; other tracks write the same cross-faded bed as the MoviePy path
+        to a raw PCM file in work_dir (a plain -stream_loop would hard-cut every seam).
+        """
+        pcm_args = ["-f", "f32le", "-ar", str(self.sample_rate), "-ac", str(self.channels)]
+        bed = self.bed(name, duration, crossfade)
+        if not bed.fade:
+            return ["-stream_loop", "-1"] + pcm_args + ["-i", self.tracks[name][0]["path"]]
+
+        bed_path = os.path.join(work_dir, "music_bed.f32")
+        frames = int(duration * self.sample_rate) + 1
+        with open(bed_path, "wb") as f:
+            for start in range(0, frames, MUSIC_BLOCK_SAMPLES):
+                f.write(bed.read(np.arange(start, min(frames, start + MUSIC_BLOCK_SAMPLES))).tobytes())
+        return pcm_args + ["-i", bed_path]
+
+
+class MusicBed:
+    """A track looped to any length. Loop seams cross-fade the tail into the head at constant power."""
+
+    def __init__(self, samples, sample_rate, duration, crossfade=0.0):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.fade = min(int(crossfade * sample_rate), len(samples) // 2)
+        # Each loop after the first starts inside the previous one's fading tail
+        self.period = len(samples) - self.fade
+
+    def read(self, index):
+        """Samples at the given frame indices (numpy int array), shape (len(index), channels)."""
+        index = np.asarray(index, dtype=np.int64)
+        position = index % self.period
+        frames = self.samples[position]
+        if self.fade:
+            # The first fade frames of every repeat overlap the tail of the previous loop
+            seam = (position < self.fade) & (index >= self.period)
+            if seam.any():
+                # Equal-power gains (sin/cos), so uncorrelated head and tail keep their loudness
+                angle = position[seam] / self.fade * (np.pi / 2)
+                head_gain = np.sin(angle).astype(np.float32)[:, None]
+                tail_gain = np.cos(angle).astype(np.float32)[:, None]
+                tail = self.samples[position[seam] + self.period]
+                frames[seam] = frames[seam] * head_gain + tail * tail_gain
+        return frames
+
+    def make_frame(self, t):
+        """MoviePy make_frame: t is a time or an array of times in seconds."""
+        index = (np.asarray(t, dtype=np.float64) * self.sample_rate).astype(np.int64)
+        if index.ndim == 0:
+            return self.read(index[None])[0]
+        return self.read(index)
+
+
+if __name__ == "__main__":
+    library = MusicLibrary(loop_files=("static/lofi_loop.wav",))
+    for track_name in library.scan():
+        info = library.metadata(track_name)
+        print(f"✅ {track_name}: {info['duration']:.0f}s, {info['rms_db']:.1f} dB RMS -> {info['normalized_rms_db']:.1f} dB")
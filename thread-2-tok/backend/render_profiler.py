@@ -0,0 +1,145 @@
+"""
+Render Profiler
+Opt-in frame-level profiler for the MoviePy render path. Each layer of the clip
+graph (background decode, crop, captions, resize, composite) is wrapped so every
+get_frame call is timed; nested layers are subtracted, so each layer reports its
+own cost. Time spent blocked in FFMPEG_VideoWriter.write_frame is recorded as
+encoder wait. Results are written as collapsed stacks (flamegraph.pl /
+speedscope input), a JSON per-frame histogram and a summary table.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+FRAME_PROFILE_DIR = os.getenv("FRAME_PROFILE_DIR")  # Set to profile every MoviePy render into this directory
+# Upper bounds (milliseconds) of the per-frame cost histogram buckets
+FRAME_COST_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class FrameProfiler:
+    """Per-layer self time of every frame plus encoder wait."""
+
+    def __init__(self):
+        self.local = threading.local()
+        self.samples = defaultdict(list)   # layer -> self seconds per call
+        self.stacks = defaultdict(float)   # "render;composite;captions" -> total self seconds
+        self.lock = threading.Lock()
+        self.started = None
+        self.elapsed = 0.0
+
+    def _stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def _record(self, layer, path, seconds):
+        with self.lock:
+            self.samples[layer].append(seconds)
+            self.stacks[path] += seconds
+
+    def wrap(self, clip, layer):
+        """Return clip with its get_frame timed as `layer` (audio and duration are kept)."""
+        def timed(get_frame, t):
+            stack = self._stack()
+            stack.append([layer, 0.0])  # Layer name, time spent in nested layers
+            started = time.perf_counter()
+            try:
+                return get_frame(t)
+            finally:
+                elapsed = time.perf_counter() - started
+                name, nested = stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                path = ";".join(["render"] + [entry[0] for entry in stack] + [name])
+                self._record(name, path, elapsed - nested)
+
+        return clip.fl(timed)
+
+    @contextlib.contextmanager
+    def encoding(self):
+        """Time the whole write and every FFMPEG_VideoWriter.write_frame call (encoder wait)."""
+        from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+        original_write_frame = FFMPEG_VideoWriter.write_frame
+        profiler = self
+
+        def write_frame(writer, img_array):
+            started = time.perf_counter()
+            try:
+                return original_write_frame(writer, img_array)
+            finally:
+                profiler._record("encoder_wait", "render;encoder_wait", time.perf_counter() - started)
+
+        # Class-level patch: only profile one render per process at a time
+        FFMPEG_VideoWriter.write_frame = write_frame
+        self.started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.elapsed = time.perf_counter() - self.started
+            FFMPEG_VideoWriter.write_frame = original_write_frame
+
+    def summary(self):
+        """Per-layer stats: frames, total seconds, mean/p50/p95/max ms, share of the render and histogram."""
+        layers = {}
+        for layer, values in self.samples.items():
+            ordered = sorted(values)
+            histogram = [0] * (len(FRAME_COST_BUCKETS_MS) + 1)
+            for seconds in values:
+                milliseconds = seconds * 1000
+                bucket = next((i for i, bound in enumerate(FRAME_COST_BUCKETS_MS) if milliseconds <= bound),
+                              len(FRAME_COST_BUCKETS_MS))
+                histogram[bucket] += 1
+            total = sum(values)
+            layers[layer] = {
+                "frames": len(values),
+                "total_seconds": total,
+                "mean_ms": total / len(values) * 1000 if values else 0.0,
+                "p50_ms": _percentile(ordered, 0.5) * 1000,
+                "p95_ms": _percentile(ordered, 0.95) * 1000,
+                "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+                "share": total / self.elapsed if self.elapsed else 0.0,
+                "histogram_ms": dict(zip([str(b) for b in FRAME_COST_BUCKETS_MS] + ["+Inf"], histogram)),
+            }
+        return layers
+
+    def collapsed_stacks(self):
+        """Collapsed stack lines (`a;b;c <microseconds>`); untimed work shows up as render;other."""
+        stacks = dict(self.stacks)
+        other = self.elapsed - sum(stacks.values())
+        if other > 0:
+            stacks["render;other"] = other
+        return [f"{path} {int(seconds * 1e6)}" for path, seconds in sorted(stacks.items()) if seconds > 0]
+
+    def format_table(self):
+        lines = [f"{'layer':<14}{'frames':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}"
+                 f"{'max ms':>9}{'share':>8}"]
+        for layer, stats in sorted(self.summary().items(), key=lambda item: -item[1]["total_seconds"]):
+            lines.append(f"{layer:<14}{stats['frames']:>8}{stats['total_seconds']:>10.2f}{stats['mean_ms']:>10.2f}"
+                         f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+                         f"{stats['share'] * 100:>7.1f}%")
+        lines.append(f"{'render total':<14}{'':>8}{self.elapsed:>10.2f}")
+        return "\n".join(lines)
+
+    def write(self, output_dir, name):
+        """Write <name>.folded, <name>.json and <name>.txt to output_dir. Returns the summary table."""
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, name)
+        with open(f"{base}.folded", "w") as f:
+            f.write("\n".join(self.collapsed_stacks()) + "\n")
+        with open(f"{base}.json", "w") as f:
+            json.dump({"elapsed_seconds": self.elapsed, "layers": self.summary()}, f, indent=2)
+        table = self.format_table()
+        with open(f"{base}.txt", "w") as f:
+            f.write(table + "\n")
+        return table
@@ -0,0 +1,160 @@
+"""
+Render Profiles
+Named encoder settings (x264 preset, CRF, threads, output height, fps) used by
+both render backends, plus a calibration command that times candidate settings
+on this machine with a synthetic clip and saves the fastest one that still
+meets a quality (SSIM) floor as this machine's "standard" profile.
+
+Usage: python render_profiles.py              (list profiles)
+       python render_profiles.py --calibrate  (tune "standard" for this machine)
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+# height=None keeps the 9:16 crop's own resolution, threads=0 lets x264 pick
+RenderProfile = namedtuple("RenderProfile", ["name", "preset", "crf", "threads", "height", "fps"])
+
+RENDER_PROFILES = {
+    # 960 high, below the 1080-high crop of 1080p gameplay, so draft renders encode fewer pixels
+    "draft": RenderProfile("draft", "ultrafast", 28, 0, 960, 24),
+    "standard": RenderProfile("standard", "medium", 23, 0, None, 24),
+    "archival": RenderProfile("archival", "slow", 18, 0, None, 30),
+}
+DEFAULT_RENDER_PROFILE = os.getenv("RENDER_PROFILE", "standard")
+# Machine-local calibration result, overrides the built-in "standard" profile
+CALIBRATED_PROFILE_FILE = os.getenv("CALIBRATED_PROFILE_FILE", "render_profile.json")
+
+CALIBRATION_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"]
+CALIBRATION_CRFS = [20, 23, 26]
+CALIBRATION_SSIM_FLOOR = 0.97
+CALIBRATION_SECONDS = 4
+CALIBRATION_SIZE = (1080, 1920)
+
+
+def load_calibrated_profile(profile_file=CALIBRATED_PROFILE_FILE):
+    """Return the RenderProfile saved by --calibrate on this machine, or None."""
+    try:
+        with open(profile_file, "r") as f:
+            data = json.load(f)
+        return RenderProfile(**data["profile"])
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return None
+
+
+def get_render_profile(profile=None):
+    """Resolve a profile name (or RenderProfile) to a RenderProfile; unknown names fall back to standard."""
+    if isinstance(profile, RenderProfile):
+        return profile
+    name = (profile or DEFAULT_RENDER_PROFILE).lower()
+    if name == "standard":
+        calibrated = load_calibrated_profile()
+        if calibrated:
+            return calibrated
+    if name not in RENDER_PROFILES:
+        print(f"⚠️ Unknown render profile '{name}', using standard")
+        name = "standard"
+    return RENDER_PROFILES[name]
+
+
+def x264_args(profile):
+    """ffmpeg encoder arguments for a profile."""
+    return ["-preset", profile.preset, "-crf", str(profile.crf), "-threads", str(profile.threads)]
+
+
+def _synthetic_source(seconds, size, fps):
+    """lavfi input for a moving, noisy test pattern (roughly as hard to encode as gameplay footage)."""
+    width, height = size
+    return ["-f", "lavfi", "-i",
+            f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds},noise=alls=12:allf=t"]
+
+
+def measure_encode(profile, work_dir, seconds=CALIBRATION_SECONDS, size=CALIBRATION_SIZE):
+    """Encode the synthetic clip with a profile. Returns seconds per output second, bytes and SSIM."""
+    output_file = os.path.join(work_dir, f"{profile.name}_{profile.preset}_{profile.crf}.mp4")
+    scale = ["-vf", f"scale=-2:{profile.height}"] if profile.height else []
+
+    started = time.perf_counter()
+    subprocess.run(["ffmpeg", "-y", "-v", "error"] + _synthetic_source(seconds, size, profile.fps) + scale
+                   + ["-c:v", "libx264", "-pix_fmt", "yuv420p"] + x264_args(profile) + [output_file],
+                   check=True)
+    elapsed = time.perf_counter() - started
+
+    # SSIM against the (identically scaled) source pattern
+    reference_scale = f"scale=-2:{profile.height}," if profile.height else ""
+    result = subprocess.run(
+        ["ffmpeg", "-v", "info", "-i", output_file] + _synthetic_source(seconds, size, profile.fps)
+        + ["-lavfi", f"[1:v]{reference_scale}format=yuv420p[ref];[0:v][ref]ssim", "-f", "null", "-"],
+        capture_output=True, text=True, check=True
+    )
+    match = re.search(r"All:([0-9.]+)", result.stderr)
+    return {
+        "seconds_per_second": elapsed / seconds,
+        "bytes": os.path.getsize(output_file),
+        "ssim": float(match.group(1)) if match else 0.0,
+    }
+
+
+def calibrate(ssim_floor=CALIBRATION_SSIM_FLOOR, seconds=CALIBRATION_SECONDS, profile_file=CALIBRATED_PROFILE_FILE):
+    """Time every candidate preset/CRF here and save the fastest one meeting the SSIM floor."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="calibrate-") as work_dir:
+        for preset in CALIBRATION_PRESETS:
+            for crf in CALIBRATION_CRFS:
+                # threads=0 lets x264 size its pool on whatever machine later loads the profile
+                candidate = RenderProfile("standard", preset, crf, 0, None, 24)
+                try:
+                    measurement = measure_encode(candidate, work_dir, seconds)
+                except Exception as e:
+                    print(f"Error encoding with {preset}/crf {crf}: {e}")
+                    continue
+                results.append((candidate, measurement))
+                print(f"  {preset:>9} crf {crf}: {measurement['seconds_per_second']:.2f}s/s, "
+                      f"{measurement['bytes'] / 1024:.0f} KB, SSIM {measurement['ssim']:.4f}")
+
+    passing = [(c, m) for c, m in results if m["ssim"] >= ssim_floor]
+    if not passing:
+        print(f"❌ No setting reached SSIM {ssim_floor}, keeping the built-in standard profile")
+        return None
+
+    best, measurement = min(passing, key=lambda item: (item[1]["seconds_per_second"], item[1]["bytes"]))
+    with open(profile_file, "w") as f:
+        json.dump({
+            "profile": best._asdict(),
+            "measurement": measurement,
+            "ssim_floor": ssim_floor,
+            "cpu_count": os.cpu_count(),
+            "calibrated_at": time.time(),
+            "results": [dict(c._asdict(), **m) for c, m in results],
+        }, f, indent=2)
+    print(f"✅ Standard profile for this machine: {best.preset}, crf {best.crf} "
+          f"({measurement['seconds_per_second']:.2f}s per output second) -> {profile_file}")
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List render profiles or calibrate them for this machine.")
+    parser.add_argument("--calibrate", action="store_true", help="benchmark encoder settings and save the best")
+    parser.add_argument("--ssim-floor", type=float, default=CALIBRATION_SSIM_FLOOR, help="minimum quality (SSIM)")
+    parser.add_argument("--seconds", type=float, default=CALIBRATION_SECONDS, help="length of the synthetic clip")
+    args = parser.parse_args(argv)
+
+    if args.calibrate:
+        return 0 if calibrate(args.ssim_floor, args.seconds) else 1
+
+    for name in RENDER_PROFILES:
+        profile = get_render_profile(name)
+        print(f"{name:>9}: preset {profile.preset}, crf {profile.crf}, threads {profile.threads or 'auto'}, "
+              f"height {profile.height or 'native'}, {profile.fps} fps")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Story State Store
+Append-only JSON-lines log for used/blacklisted story IDs with an in-memory
+index, file locking for parallel generator processes and periodic compaction.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(lock_path):
+    """Exclusive inter-process lock held on a sidecar .lock file."""
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s, keep waiting
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class StoryStateStore:
+    """Set of story IDs persisted as an append-only log, with optional TTL pruning."""
+
+    def __init__(self, log_file, ttl=None, legacy_file=None, legacy_key=None,
+                 compact_min_lines=200, compact_interval=24 * 3600):
+        self.log_file = log_file
+        self.lock_file = log_file + ".lock"
+        self.ttl = ttl
+        self.legacy_file = legacy_file
+        self.legacy_key = legacy_key
+        self.compact_min_lines = compact_min_lines
+        self.compact_interval = compact_interval
+        # Its mtime is the last compaction, shared by every process using the log
+        self.compact_marker_file = log_file + ".compacted"
+        self.entries = {}
+        self.line_count = 0
+        self.offset = 0
+        self.inode = None
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry.get("timestamp", 0) >= self.ttl
+
+    def _refresh(self):
+        """Read lines appended since the last refresh (or everything if the log was rewritten)."""
+        if not self.loaded:
+            self._migrate_legacy()
+            self.loaded = True
+
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            self.entries, self.line_count, self.offset, self.inode = {}, 0, 0, None
+            return
+
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # Log was compacted or cleared by someone else, start over
+            self.entries, self.line_count, self.offset = {}, 0, 0
+            self.inode = stat.st_ino
+
+        if stat.st_size == self.offset:
+            return
+
+        with open(self.log_file, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        # Only consume complete lines, a writer may be mid-append
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            # Later lines win: an ID is only re-appended after its previous entry expired
+            self.entries[entry["id"]] = entry
+            self.line_count += 1
+        self.offset += end
+
+    def _write_entries(self, entries):
+        """Atomically replace the log with the given entries."""
+        temp_file = f"{self.log_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.log_file)
+
+    def _migrate_legacy(self):
+        """Import the old whole-file JSON format the first time the log is used."""
+        if not self.legacy_file or os.path.exists(self.log_file) or not os.path.exists(self.legacy_file):
+            return
+        with _file_lock(self.lock_file):
+            if os.path.exists(self.log_file):
+                return
+            try:
+                with open(self.legacy_file, "r") as f:
+                    legacy_entries = json.load(f).get(self.legacy_key, [])
+                self._write_entries(legacy_entries)
+                print(f"📦 Migrated {len(legacy_entries)} entries from {self.legacy_file}")
+            except Exception as e:
+                print(f"Error migrating {self.legacy_file}: {e}")
+
+    def _compact(self):
+        """Rewrite the log with only live entries (caller holds the file lock)."""
+        now = time.time()
+        live = [entry for entry in self.entries.values() if not self._expired(entry, now)]
+        self._write_entries(live)
+        self.entries = {entry["id"]: entry for entry in live}
+        self.line_count = len(live)
+        stat = os.stat(self.log_file)
+        self.offset, self.inode = stat.st_size, stat.st_ino
+        with open(self.compact_marker_file, "a"):
+            pass
+        os.utime(self.compact_marker_file, (now, now))
+
+    def _compacted_at(self):
+        """Time of the last compaction by any process (0 if the log was never compacted)."""
+        try:
+            return os.path.getmtime(self.compact_marker_file)
+        except FileNotFoundError:
+            return 0
+
+    def ids(self):
+        """Return the set of live story IDs."""
+        with self.lock:
+            self._refresh()
+            now = time.time()
+            return {story_id for story_id, entry in self.entries.items() if not self._expired(entry, now)}
+
+    def __contains__(self, story_id):
+        with self.lock:
+            self._refresh()
+            entry = self.entries.get(story_id)
+            return entry is not None and not self._expired(entry, time.time())
+
+    def add(self, story_id, **fields):
+        """Append a story ID. Returns False if it is already present."""
+        with self.lock, _file_lock(self.lock_file):
+            self._refresh()
+            now = time.time()
+            existing = self.entries.get(story_id)
+            if existing is not None and not self._expired(existing, now):
+                return False
+
+            entry = {"id": story_id, **fields, "timestamp": now}
+            with open(self.log_file, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh()
+
+            # Compact when duplicate lines pile up, and periodically to prune expired entries
+            too_many_lines = self.line_count >= self.compact_min_lines and self.line_count > 2 * len(self.entries)
+            prune_due = self.ttl is not None and now - self._compacted_at() >= self.compact_interval
+            if too_many_lines or prune_due:
+                self._compact()
+            return True
+
+    def compact(self):
+        """Prune expired entries and rewrite the log."""
+        with self.lock, _file_lock(self.lock_file):
+            self._refresh()
+            self._compact()
+
+    def clear(self):
+        """Drop every entry."""
+        with self.lock, _file_lock(self.lock_file):
+            self._refresh()
+            self.entries = {}
+            self._compact()
@@ -0,0 +1,104 @@
+"""
+TTS Cache
+Content-addressed cache of finished narration audio, keyed by the normalized
+text, TTS engine, voice and tempo, with an LRU size cap. Retries and re-renders
+of the same story skip the network TTS round-trip.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "500")) * 1024 * 1024
+
+
+def normalize_tts_text(text):
+    """Collapse whitespace so cosmetic differences don't miss the cache."""
+    return " ".join(text.split())
+
+
+def tts_cache_key(text, engine, voice, tempo):
+    """Hash of everything that changes the synthesized audio."""
+    payload = json.dumps([normalize_tts_text(text), engine, voice, round(float(tempo), 3)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Directory of <key>.mp3 files (+ optional <key>.json timing); mtime doubles as the LRU timestamp."""
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _metadata_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key, output_file):
+        """Copy the cached audio to output_file. Returns its metadata dict on a hit, None on a miss."""
+        cached_path = self._path(key)
+        try:
+            shutil.copyfile(cached_path, output_file)
+            os.utime(cached_path)  # Mark as recently used
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading TTS cache: {e}")
+            return None
+
+        try:
+            with open(self._metadata_path(key), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def put(self, key, audio_file, metadata=None):
+        """Store finished audio under key, then evict least recently used entries over the cap."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+            if metadata is not None:
+                # Metadata first, so a visible .mp3 always has its timing next to it
+                with open(f"{self._metadata_path(key)}.{temp_suffix}", "w") as f:
+                    json.dump(metadata, f)
+                os.replace(f"{self._metadata_path(key)}.{temp_suffix}", self._metadata_path(key))
+            cached_path = self._path(key)
+            shutil.copyfile(audio_file, f"{cached_path}.{temp_suffix}")
+            os.replace(f"{cached_path}.{temp_suffix}", cached_path)
+            self.evict()
+        except Exception as e:
+            print(f"Error writing TTS cache: {e}")
+
+    def evict(self):
+        """Delete the oldest entries until the cache fits in max_bytes."""
+        with self.lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".mp3"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+                try:
+                    os.remove(path[:-len(".mp3")] + ".json")
+                except FileNotFoundError:
+                    pass
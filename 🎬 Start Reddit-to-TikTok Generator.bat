@@ -27,8 +27,8 @@ call venv\Scripts\activate.bat
 REM Navigate to backend directory
 cd thread-2-tok\backend
 
-REM Run the app
-py app.py
+REM Run the launcher (uses the generator daemon when it is running)
+py launcher.py --no-pause
 
 REM Keep window open
 echo.